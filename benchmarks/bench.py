@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for scanning, planning, execution and history.
+
+    python benchmarks/bench.py                 # full size (100k-file flat tree)
+    python benchmarks/bench.py --scale 0.1 -o before.json
+    python benchmarks/compare.py before.json after.json
+
+Synthetic trees are generated in a temporary directory and removed afterwards.
+History, recovery log, scan and metadata caches also live there, so the
+user's own files are never touched.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import renamer
+from renamer import FileRenamer, patterns
+from renamer.journal import HistoryJournal, MAX_RECORDS
+from renamer.metacache import MetadataCache
+from renamer.namespace import NameIndex
+from renamer.scancache import ScanCache
+from renamer.wal import RenameLog
+
+
+# 每个 patterns 函数的预览参数；number_sequence 需要序号，走 preview_number_rename
+PATTERN_CASES = {
+    "add_prefix": {"prefix": "pre_"},
+    "add_suffix": {"suffix": "_suf"},
+    "replace_text": {"old_text": "file", "new_text": "doc"},
+    "replace_text_regex": {"old_text": r"(\d+)", "new_text": r"n\1", "use_regex": True},
+    "change_case": {"case_type": "upper"},
+    "date_time_name": {"keep_original": True},
+    "remove_characters": {"remove_special": True, "custom_chars": "_"},
+    "insert_text": {"text": "x", "position": 2},
+    "truncate_name": {"max_length": 6},
+    "content_hash_name": {"length": 8},
+    "media_date_name": {"keep_original": True},
+}
+
+
+# 生成测试目录树
+
+def make_files(directory: Path, count: int, name="file_{:06d}.txt"):
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        open(directory / name.format(i), "w").close()
+
+
+def make_flat(root: Path, count: int) -> Path:
+    path = root / "flat"
+    make_files(path, count)
+    return path
+
+
+def make_deep(root: Path, count: int, depth: int = 20, branches: int = 10) -> Path:
+    # branches 条深度为 depth 的目录链，每层放相同数量的文件
+    path = root / "deep"
+    per_dir = max(1, count // (depth * branches))
+    for b in range(branches):
+        current = path / f"branch_{b}"
+        for level in range(depth):
+            current = current / f"level_{level}"
+            make_files(current, per_dir)
+    return path
+
+
+def make_collisions(root: Path, count: int) -> Path:
+    # 每个文件加前缀 "a_" 后都会与已有文件重名
+    path = root / "collisions"
+    make_files(path, count // 2)
+    make_files(path, count // 2, name="a_file_{:06d}.txt")
+    return path
+
+
+def age_tree(root: Path, seconds: float = 3600):
+    # 刚创建的目录 mtime 太新，扫描缓存不会信任它们
+    past = time.time() - seconds
+    for current, _, _ in os.walk(root):
+        os.utime(current, (past, past))
+
+
+# 计时
+
+def measure(func, repeat: int, setup=None, teardown=None) -> dict:
+    times = []
+    result = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+        if teardown is not None:
+            teardown()
+    entry = {"best": min(times), "median": statistics.median(times), "runs": len(times)}
+    if isinstance(result, int):
+        entry["items"] = result
+    return entry
+
+
+def isolated_renamer(work: Path) -> FileRenamer:
+    r = FileRenamer()
+    r.history_file = work / "history.jsonl"
+    r.journal = HistoryJournal(r.history_file)
+    r.wal = RenameLog(work / "wal.jsonl")
+    r.scan_cache = ScanCache(work / "scan.sqlite3")
+    r.metadata_cache = MetadataCache(work / "metadata.sqlite3")
+    return r
+
+
+def bench_scan(r: FileRenamer, trees: dict, repeat: int, results: dict):
+    for name, path in trees.items():
+        r.scan_cache.clear()
+        results[f"get_files_{name}_cold"] = measure(lambda: len(r.get_files(path, "*", True)), 1)
+        results[f"get_files_{name}"] = measure(lambda: len(r.get_files(path, "*", True)), repeat)
+
+        r.scan_cache.enabled = False
+        results[f"get_files_{name}_nocache"] = measure(lambda: len(r.get_files(path, "*", True)), repeat)
+        r.scan_cache.enabled = True
+
+
+def bench_preview(r: FileRenamer, files: list, repeat: int, results: dict):
+    for case, kwargs in PATTERN_CASES.items():
+        func = getattr(patterns, case.replace("_regex", ""))
+        results[f"preview_{case}"] = measure(lambda: len(r.preview_rename(files, func, **kwargs)), repeat)
+    results["preview_number_sequence"] = measure(
+        lambda: len(r.preview_number_rename(files, digits=6)), repeat
+    )
+    results["preview_number_sorted_name"] = measure(
+        lambda: len(r.preview_number_rename(files, digits=6, sort_by="name", per_directory=True)), repeat
+    )
+    results["preview_number_sorted_mtime"] = measure(
+        lambda: len(r.preview_number_rename(files, digits=6, sort_by="mtime")), repeat
+    )
+
+
+def bench_conflicts(r: FileRenamer, collisions: Path, count: int, repeat: int, results: dict):
+    files = r.get_files(collisions)
+    results["preview_collisions"] = measure(
+        lambda: len(r.preview_rename(files, patterns.add_prefix, prefix="a_")), repeat
+    )
+
+    # 最坏情况：所有文件都想改成同一个名字
+    target = collisions / "same.txt"
+    sources = [collisions / f"src_{i}.txt" for i in range(count)]
+
+    def resolve_same():
+        index = NameIndex()
+        for source in sources:
+            r._resolve_conflict(target, source, index)
+        return len(sources)
+
+    results["resolve_conflict_same_name"] = measure(resolve_same, repeat)
+
+
+def bench_execute(r: FileRenamer, flat: Path, repeat: int, results: dict):
+    files = r.get_files(flat)
+    plan = r.preview_rename(files, patterns.add_prefix, prefix="x_")
+    undo_times = []
+
+    def undo():
+        start = time.perf_counter()
+        success, message = r.undo_last_operation()
+        undo_times.append(time.perf_counter() - start)
+        if not success:
+            raise RuntimeError(message)
+
+    results["execute_rename"] = measure(lambda: r.execute_rename(plan)[0], repeat, teardown=undo)
+    results["undo_last_operation"] = {
+        "best": min(undo_times), "median": statistics.median(undo_times),
+        "runs": len(undo_times), "items": len(plan)
+    }
+
+
+def bench_history(work: Path, ops: int, repeat: int, results: dict):
+    path = work / "history_bench.jsonl"
+    record = {
+        "timestamp": "2024-01-01T00:00:00",
+        "operations": [
+            {"old": f"/data/photos/img_{i:06d}.jpg", "new": f"/data/photos/trip_{i:06d}.jpg"}
+            for i in range(ops)
+        ]
+    }
+
+    def save():
+        path.unlink(missing_ok=True)
+        journal = HistoryJournal(path)
+        for _ in range(MAX_RECORDS):
+            journal.append(record)
+        return MAX_RECORDS
+
+    results["history_save"] = measure(save, repeat)
+    results["history_load"] = measure(lambda: len(HistoryJournal(path).records()), repeat)
+    results["history_last"] = measure(lambda: len(HistoryJournal(path).last()["operations"]), repeat)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="1.0 = 100k files in the flat tree")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    parser.add_argument("--keep", action="store_true", help="keep the generated trees")
+    args = parser.parse_args(argv)
+
+    count = max(10, int(100_000 * args.scale))
+    work = Path(tempfile.mkdtemp(prefix="renamer_bench_"))
+    results = {}
+
+    try:
+        print(f"Generating trees in {work} ...", file=sys.stderr)
+        trees = {
+            "flat": make_flat(work, count),
+            "deep": make_deep(work, count // 2),
+        }
+        collisions = make_collisions(work, count // 2)
+        age_tree(work)
+
+        r = isolated_renamer(work)
+        print("Scanning ...", file=sys.stderr)
+        bench_scan(r, trees, args.repeat, results)
+        print("Previewing ...", file=sys.stderr)
+        bench_preview(r, r.get_files(trees["flat"]), args.repeat, results)
+        print("Resolving conflicts ...", file=sys.stderr)
+        bench_conflicts(r, collisions, count // 10, args.repeat, results)
+        print("Renaming ...", file=sys.stderr)
+        bench_execute(r, trees["flat"], args.repeat, results)
+        print("History ...", file=sys.stderr)
+        bench_history(work, count // 10, args.repeat, results)
+    finally:
+        if args.keep:
+            print(f"Trees kept in {work}", file=sys.stderr)
+        else:
+            shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "version": renamer.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "files": count,
+            "repeat": args.repeat,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            out.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
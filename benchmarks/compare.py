@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark results written by bench.py.
+
+    python benchmarks/compare.py before.json after.json [--threshold 1.1]
+
+Exits with status 1 when any benchmark is slower than the threshold ratio.
+"""
+
+import sys
+import json
+import argparse
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=1.1,
+                        help="after/before ratio above which a result counts as a regression")
+    args = parser.parse_args(argv)
+
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)["results"]
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)["results"]
+
+    regressions = 0
+    width = max(len(name) for name in after)
+    for name, result in after.items():
+        if name not in before:
+            print(f"{name:<{width}}  {result['best']:10.4f}s  (new)")
+            continue
+        ratio = result["best"] / before[name]["best"] if before[name]["best"] else float("inf")
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{name:<{width}}  {before[name]['best']:10.4f}s -> {result['best']:10.4f}s  x{ratio:.2f}{flag}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,9 @@ from .patterns import (
     change_case,
     date_time_name,
 )
+from .rules import RenameRule, compile_rule
+from .plan import RenamePlan
+from .filters import FileFilter
 
 __all__ = [
     "FileRenamer",
@@ -18,4 +21,8 @@ __all__ = [
     "number_sequence",
     "change_case",
     "date_time_name",
+    "RenameRule",
+    "compile_rule",
+    "RenamePlan",
+    "FileFilter",
 ]
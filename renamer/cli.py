@@ -0,0 +1,340 @@
+"""
+Command line interface: python -m renamer
+"""
+
+import sys
+import csv
+import json
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+from .core import FileRenamer
+from .rules import compile_rule
+from .plan import RenamePlan
+from .filters import FileFilter, is_path_pattern
+from .wal import PendingPlanError
+from .ordering import SORT_KEYS
+
+
+def add_mode_parsers(parser: argparse.ArgumentParser):
+    modes = parser.add_subparsers(dest="mode", metavar="MODE", required=True)
+
+    p = modes.add_parser("prefix", help="add a prefix")
+    p.add_argument("prefix")
+
+    p = modes.add_parser("suffix", help="add a suffix before the extension")
+    p.add_argument("suffix")
+
+    p = modes.add_parser("replace", help="replace text in the name")
+    p.add_argument("old_text")
+    p.add_argument("new_text")
+    p.add_argument("--regex", dest="use_regex", action="store_true")
+    p.add_argument("--ignore-case", dest="case_sensitive", action="store_false")
+
+    p = modes.add_parser("number", help="rename to a number sequence")
+    p.add_argument("--start", type=int, default=1)
+    p.add_argument("--digits", type=int, default=3)
+    p.add_argument("--prefix", default="")
+    p.add_argument("--keep-original", action="store_true")
+
+    p = modes.add_parser("case", help="change the case of the name")
+    p.add_argument("case_type", choices=["lower", "upper", "title", "sentence"])
+
+    p = modes.add_parser("datetime", help="name files by timestamp")
+    p.add_argument("--format", dest="date_format", default="%Y%m%d_%H%M%S")
+    p.add_argument("--ctime", dest="use_modified_time", action="store_false",
+                   help="use creation time instead of modification time")
+    p.add_argument("--prefix", default="")
+    p.add_argument("--suffix", default="")
+    p.add_argument("--keep-original", action="store_true")
+
+    p = modes.add_parser("remove", help="remove characters")
+    p.add_argument("--spaces", dest="remove_spaces", action="store_true")
+    p.add_argument("--special", dest="remove_special", action="store_true")
+    p.add_argument("--chars", dest="custom_chars", default="")
+
+    p = modes.add_parser("insert", help="insert text at the start or end")
+    p.add_argument("text")
+    p.add_argument("--position", type=int, default=0,
+                   help="0 for the start, -1 for the end")
+
+    p = modes.add_parser("truncate", help="truncate long names")
+    p.add_argument("--max-length", type=int, default=50)
+    p.add_argument("--from-end", dest="from_start", action="store_false")
+
+    p = modes.add_parser("hash", help="name files by a digest of their content")
+    p.add_argument("--algorithm", default="sha1")
+    p.add_argument("--length", type=int, default=12, help="digest characters to keep (0 for all)")
+    p.add_argument("--read-bytes", type=parse_size, default=0, metavar="SIZE",
+                   help="hash only the first SIZE bytes (0 for the whole file)")
+    p.add_argument("--prefix", default="")
+    p.add_argument("--keep-original", action="store_true")
+
+    p = modes.add_parser("mediadate", help="name files by EXIF capture or ID3 recording date")
+    p.add_argument("--format", dest="date_format", default="%Y%m%d_%H%M%S")
+    p.add_argument("--prefix", default="")
+    p.add_argument("--suffix", default="")
+    p.add_argument("--keep-original", action="store_true")
+    p.add_argument("--no-fallback", dest="fallback_to_mtime", action="store_false",
+                   help="keep the name of files without an embedded date instead of using mtime")
+
+    p = modes.add_parser("template", help='build names from a template such as "{date:%%Y%%m%%d}_{counter:04}{ext}"')
+    p.add_argument("template",
+                   help="fields: name stem ext parent counter size date ctime taken hash; "
+                        "filters: |lower |upper |title |sentence |strip")
+    p.add_argument("--start", type=int, default=1, help="first value of {counter}")
+
+    p = modes.add_parser("chain", help="apply several modes in one pass")
+    p.add_argument("steps", type=load_steps,
+                   help='JSON list such as \'[{"mode": "prefix", "prefix": "a_"}]\', or @file.json')
+
+
+def load_steps(value: str) -> list:
+    try:
+        if value.startswith("@"):
+            with open(value[1:], "r", encoding="utf-8") as f:
+                steps = json.load(f)
+        else:
+            steps = json.loads(value)
+    except (OSError, ValueError) as e:
+        raise argparse.ArgumentTypeError(f"invalid chain: {e}")
+    if not isinstance(steps, list) or not all(isinstance(step, dict) and "mode" in step for step in steps):
+        raise argparse.ArgumentTypeError("chain must be a list of objects with a \"mode\" key")
+    return steps
+
+
+def parse_size(value: str) -> int:
+    # 支持 K / M / G 后缀（1024 进制）
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    try:
+        suffix = value[-1:].upper()
+        if suffix in units:
+            return int(float(value[:-1]) * units[suffix])
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value}")
+
+
+def parse_time(value: str) -> float:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {value} (expected YYYY-MM-DD[THH:MM[:SS]])")
+
+
+def add_selection_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("directory")
+    parser.add_argument("-p", "--pattern", default="*",
+                        help='glob(s) separated by ";", e.g. "*.jpg;*.png;!*.tmp;!.git/"')
+    parser.add_argument("-r", "--recursive", action="store_true")
+    parser.add_argument("-x", "--exclude", action="append", default=[], metavar="GLOB",
+                        help="skip files whose name matches GLOB (repeatable)")
+    parser.add_argument("--exclude-dir", action="append", default=[], metavar="GLOB",
+                        help="do not descend into directories named GLOB (repeatable)")
+    parser.add_argument("--name-regex", metavar="REGEX", help="only files whose name contains a match")
+    parser.add_argument("--min-size", type=parse_size, metavar="SIZE", help="e.g. 100K, 5M")
+    parser.add_argument("--max-size", type=parse_size, metavar="SIZE")
+    parser.add_argument("--newer", type=parse_time, metavar="DATE", help="modified at or after DATE")
+    parser.add_argument("--older", type=parse_time, metavar="DATE", help="modified at or before DATE")
+    parser.add_argument("-j", "--processes", type=int, default=0,
+                        help="compute new names in N worker processes (for heavy regex rules)")
+    parser.add_argument("--sort", choices=SORT_KEYS,
+                        help="number files in this order (name is natural: img2 before img10; "
+                             "taken is the EXIF/ID3 date) instead of the scan order")
+    parser.add_argument("--reverse", action="store_true", help="reverse the --sort order")
+    parser.add_argument("--per-directory", action="store_true",
+                        help="restart the number sequence / {counter} in every directory")
+
+
+def build_filter(args):
+    # 含路径的模式保持原样，交给 pathlib.glob
+    if is_path_pattern(args.pattern):
+        return args.pattern
+    return FileFilter.parse(
+        args.pattern,
+        exclude=args.exclude,
+        prune_dirs=args.exclude_dir,
+        regex=args.name_regex,
+        min_size=args.min_size,
+        max_size=args.max_size,
+        newer_than=args.newer,
+        older_than=args.older,
+    )
+
+
+def iter_plan(renamer: FileRenamer, args) -> Iterator[Tuple[Path, Path]]:
+    rule = compile_rule(args.mode, **rule_params(args))
+    files = (
+        file_path
+        for batch in renamer.iter_files(args.directory, build_filter(args), args.recursive)
+        for file_path in batch
+    )
+    if args.sort or args.per_directory:
+        files = renamer.sort_files(files, args.sort, args.reverse, args.per_directory)
+    return renamer.iter_preview(files, rule, processes=args.processes, per_directory=args.per_directory)
+
+
+def rule_params(args) -> dict:
+    # 除去通用选项后剩下的就是模式参数
+    common = {"command", "mode", "directory", "pattern", "recursive",
+              "format", "output", "changed_only", "workers", "metrics", "processes",
+              "exclude", "exclude_dir", "name_regex", "min_size", "max_size", "newer", "older",
+              "sort", "reverse", "per_directory"}
+    return {key: value for key, value in vars(args).items() if key not in common}
+
+
+def write_plan(plan: Iterable[Tuple[Path, Path]], out, fmt: str = "jsonl", changed_only: bool = False) -> int:
+    writer = csv.writer(out) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(["old", "new"])
+
+    count = 0
+    for old_path, new_path in plan:
+        if changed_only and old_path == new_path:
+            continue
+        if writer is not None:
+            writer.writerow([str(old_path), str(new_path)])
+        else:
+            out.write(json.dumps({"old": str(old_path), "new": str(new_path)}, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def read_plan(source) -> Iterator[Tuple[Path, Path]]:
+    first = source.readline()
+    if first.startswith("{"):
+        entry = json.loads(first)
+        yield Path(entry["old"]), Path(entry["new"])
+        for line in source:
+            if line.strip():
+                entry = json.loads(line)
+                yield Path(entry["old"]), Path(entry["new"])
+    else:
+        # CSV，第一行是表头
+        for row in csv.reader(source):
+            if row:
+                yield Path(row[0]), Path(row[1])
+
+
+def report(success_count: int, errors: List[str], verb: str = "Renamed") -> int:
+    print(f"{verb} {success_count} files")
+    for error in errors:
+        print(error, file=sys.stderr)
+    return 1 if errors else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m renamer", description="Batch File Renamer")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write phase timings, syscall counts and error categories as JSON")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    p = commands.add_parser("preview", help="stream the rename plan as JSONL or CSV")
+    add_selection_arguments(p)
+    p.add_argument("-f", "--format", choices=["jsonl", "csv"], default="jsonl")
+    p.add_argument("-o", "--output", help="write the plan to a file instead of stdout")
+    p.add_argument("--changed-only", action="store_true", help="omit files whose name does not change")
+    add_mode_parsers(p)
+
+    p = commands.add_parser("execute", help="preview and rename in one step")
+    add_selection_arguments(p)
+    p.add_argument("-w", "--workers", type=int, default=1)
+    add_mode_parsers(p)
+
+    p = commands.add_parser("apply", help="execute a plan written by preview")
+    p.add_argument("plan", help="plan file, or - for stdin")
+    p.add_argument("-w", "--workers", type=int, default=1)
+
+    p = commands.add_parser("undo", help="undo the last operation")
+    p.add_argument("-n", "--count", type=int, default=1, help="undo the last N operations as one plan")
+    p.add_argument("-w", "--workers", type=int, default=1)
+
+    p = commands.add_parser("history", help="show recent operations")
+    p.add_argument("-n", "--limit", type=int, default=10)
+    p.add_argument("-v", "--verbose", action="store_true", help="include every file")
+
+    commands.add_parser("clear-history", help="clear the operation history")
+    commands.add_parser("resume", help="finish an interrupted rename")
+    commands.add_parser("rollback", help="revert an interrupted rename")
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    renamer = FileRenamer()
+    if args.metrics:
+        renamer.enable_metrics()
+
+    try:
+        return run_command(renamer, args)
+    finally:
+        if args.metrics:
+            with open(args.metrics, "w", encoding="utf-8") as out:
+                out.write(renamer.metrics.to_json() + "\n")
+
+
+def run_command(renamer: FileRenamer, args) -> int:
+    try:
+        if args.command == "preview":
+            plan = iter_plan(renamer, args)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8", newline="") as out:
+                    count = write_plan(plan, out, args.format, args.changed_only)
+                print(f"Planned {count} files", file=sys.stderr)
+            else:
+                write_plan(plan, sys.stdout, args.format, args.changed_only)
+            return 0
+
+        if args.command in ("execute", "apply", "undo") and renamer.has_pending():
+            # 先于扫描和预览检查，避免白做一遍
+            raise PendingPlanError()
+
+        if args.command == "execute":
+            plan = RenamePlan((old, new) for old, new in iter_plan(renamer, args) if old != new)
+            return report(*renamer.execute_rename(plan, workers=args.workers))
+
+        if args.command == "apply":
+            if args.plan == "-":
+                plan = RenamePlan(read_plan(sys.stdin))
+            else:
+                with open(args.plan, "r", encoding="utf-8", newline="") as source:
+                    plan = RenamePlan(read_plan(source))
+            return report(*renamer.execute_rename(plan, workers=args.workers))
+
+        if args.command == "undo":
+            success, message = renamer.undo_last_operation(args.count, args.workers)
+            print(message, file=sys.stdout if success else sys.stderr)
+            return 0 if success else 1
+
+        if args.command == "history":
+            for record in renamer.get_history(args.limit):
+                if args.verbose:
+                    print(json.dumps(record, ensure_ascii=False))
+                else:
+                    partial = "  (partially undone)" if record.get("partial") else ""
+                    print(f"{record['timestamp']}  {len(record['operations'])} files{partial}")
+            return 0
+
+        if args.command == "clear-history":
+            renamer.clear_history()
+            return 0
+
+        if args.command == "resume":
+            return report(*renamer.resume())
+
+        if args.command == "rollback":
+            return report(*renamer.rollback(), verb="Rolled back")
+
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    except PendingPlanError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        print("Run 'python -m renamer resume' to finish it or 'python -m renamer rollback' to revert it.",
+              file=sys.stderr)
+        return 2
+
+    return 0
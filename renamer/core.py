@@ -1,151 +1,620 @@
 import os
+import itertools
+import threading
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Tuple, Callable
-import json
+from typing import List, Tuple, Callable, Iterable, Iterator, Optional, Sequence, Union
 from datetime import datetime
 
+from .scanner import iter_file_batches, DEFAULT_BATCH_SIZE
+from .filters import FileFilter, is_path_pattern
+from .namespace import NameIndex, name_key
+from .scheduler import schedule_renames, run_group, run_groups
+from .journal import HistoryJournal, compose_undo
+from .wal import RenameLog, PendingPlanError, rollback_group
+from .rules import RenameRule, NumberRule, NameColumns, rule_for_function, split_name
+from .metadata import StatCache
+from .preview import PreviewCache
+from .watcher import FileWatcher
+from .scancache import ScanCache
+from .metacache import MetadataCache
+from .metrics import Metrics
+from .parallel import iter_named_processes, supports_processes
+from .plan import RenamePlan
+from .ordering import sort_paths
+
+
+# 每完成多少步报告一次进度
+PROGRESS_INTERVAL = 100
+# 预览时每批按列求值的文件数
+PREVIEW_BATCH_SIZE = 1024
+
 
 class FileRenamer:
     
     def __init__(self):
-        self.history = []
-        self.history_file = Path.home() / ".batch_renamer_history.json"
-        self._load_history()
+        self.history_file = Path.home() / ".batch_renamer_history.jsonl"
+        # 历史记录按需加载，构造时不读取文件
+        self.journal = HistoryJournal(
+            self.history_file,
+            legacy_path=Path.home() / ".batch_renamer_history.json"
+        )
+        self.wal = RenameLog(Path.home() / ".batch_renamer_wal.jsonl")
+        # 扫描得到的文件元数据，供日期等规则使用
+        self.stats = StatCache()
+        # 持久化的目录列表缓存，mtime 未变的目录重新打开时不再列举
+        self.scan_cache = ScanCache()
+        # 持久化的内容摘要和内嵌时间，文件未变化时不再读取内容
+        self.metadata_cache = MetadataCache()
+        # 实时预览用的增量缓存
+        self.preview_cache = PreviewCache(self._plan_chunk, self.stats)
+        # 性能统计默认关闭，见 enable_metrics
+        self.metrics: Optional[Metrics] = None
+    
+    def enable_metrics(self) -> Metrics:
+        """开启性能统计并返回统计对象，report() / to_json() 导出结果。"""
+        if self.metrics is None:
+            self.metrics = Metrics()
+            self.stats.metrics = self.metrics
+            self.metadata_cache.metrics = self.metrics
+        return self.metrics
+    
+    def disable_metrics(self):
+        self.metrics = None
+        self.stats.metrics = None
+        self.metadata_cache.metrics = None
+    
+    def _phase(self, name: str):
+        return self.metrics.phase(name) if self.metrics is not None else nullcontext()
     
-    def get_files(self, directory: str, pattern: str = "*", recursive: bool = False) -> List[Path]:
+    @property
+    def history(self) -> List[dict]:
+        return self.journal.records()
+    
+    def get_files(
+        self,
+        directory: str,
+        pattern: Union[str, FileFilter] = "*",
+        recursive: bool = False
+    ) -> List[Path]:
 
+        files = []
+        for batch in self.iter_files(directory, pattern, recursive):
+            files.extend(batch)
+        return files
+    
+    def iter_files(
+        self,
+        directory: str,
+        pattern: Union[str, FileFilter] = "*",
+        recursive: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        prune: Optional[Callable] = None
+    ) -> Iterator[List[Path]]:
+        """pattern 可以是单个通配符、"*.jpg;*.png;!*.tmp;!node_modules/" 这样的写法，
+        或者带大小、时间范围和正则的 FileFilter；过滤在目录遍历中完成。
+        """
         path = Path(directory)
-        if not path.exists():
+        if self.metrics is not None:
+            self.metrics.count("stat")
+        if not path.is_dir():
             raise FileNotFoundError(f"目录不存在: {directory}")
-        
-        if recursive:
-            files = list(path.rglob(pattern))
-        else:
-            files = list(path.glob(pattern))
 
-        return [f for f in files if f.is_file()]
+        # 含路径分隔符的模式交给 pathlib 处理
+        if isinstance(pattern, str) and is_path_pattern(pattern):
+            found = path.rglob(pattern) if recursive else path.glob(pattern)
+            files = [f for f in found if f.is_file()]
+            for i in range(0, len(files), batch_size):
+                yield files[i:i + batch_size]
+            return
+
+        self.stats.clear()
+        self.preview_cache.invalidate()
+        batches = iter_file_batches(
+            path, pattern, recursive, batch_size, prune,
+            stats=self.stats, cache=self.scan_cache, metrics=self.metrics
+        )
+        if self.metrics is not None:
+            batches = self.metrics.timed("scan", batches)
+        yield from batches
+    
+    def watch(
+        self,
+        directory: str,
+        pattern: Union[str, FileFilter] = "*",
+        recursive: bool = False
+    ) -> FileWatcher:
+        """创建监视器：先用 watcher.scan() 扫描，之后 watcher.poll() 增量同步文件列表。
+
+        变化的文件会从元数据缓存和预览缓存中移除。
+        """
+        if not Path(directory).is_dir():
+            raise FileNotFoundError(f"目录不存在: {directory}")
+        self.stats.clear()
+        self.preview_cache.invalidate()
+        return FileWatcher(directory, pattern, recursive, on_change=self._forget)
+    
+    def _forget(self, path: str):
+        self.stats.discard(path)
+        self.preview_cache.invalidate(os.path.dirname(path))
     
     def preview_rename(
         self, 
         files: List[Path], 
         rename_func: Callable,
+        *,
+        processes: int = 0,
+        per_directory: bool = False,
+        **kwargs
+    ) -> RenamePlan:
+
+        return RenamePlan(self.iter_preview(
+            files, rename_func, processes=processes, per_directory=per_directory, **kwargs
+        ))
+    
+    def preview_number_rename(
+        self,
+        files: List[Path],
+        start: int = 1,
+        digits: int = 3,
+        prefix: str = "",
+        keep_original: bool = False,
+        sort_by: Optional[str] = None,
+        reverse: bool = False,
+        per_directory: bool = False
+    ) -> RenamePlan:
+        """sort_by 可以是 name（自然排序）、mtime、size 或 taken（拍摄时间），为 None 时按传入顺序编号；
+        per_directory 时每个目录从 start 重新编号。"""
+        if sort_by is not None or per_directory:
+            files = self.sort_files(files, sort_by, reverse, per_directory)
+        return self.preview_rename(
+            files, NumberRule(start, digits, prefix, keep_original), per_directory=per_directory
+        )
+    
+    def sort_files(
+        self,
+        files: Iterable[Path],
+        sort_by: Optional[str] = "name",
+        reverse: bool = False,
+        per_directory: bool = False
+    ) -> List[Path]:
+        """按名称（自然排序）、mtime、大小或拍摄时间排序，每个文件的排序键只计算一次。"""
+        with self._phase("sort"):
+            return sort_paths(
+                files, sort_by, reverse, per_directory,
+                stats=self.stats, metadata=self.metadata_cache
+            )
+    
+    def iter_preview(
+        self,
+        files: Iterable[Path],
+        rename_func: Callable,
+        *,
+        processes: int = 0,
+        per_directory: bool = False,
         **kwargs
-    ) -> List[Tuple[Path, Path]]:
+    ) -> Iterator[Tuple[Path, Path]]:
+        """流式预览：按目录分段规划，内存占用只与单个目录的文件数有关。
 
-        results = []
+        同一目录的文件需要连续出现才能流式规划（扫描结果就是这样）；传入的列表中
+        不同目录的文件交错时，先求出全部新名称，再按目录分组规划，结果仍按输入顺序产出。
+
+        rename_func 可以是 patterns 中的函数（配合 kwargs），也可以是编译好的 RenameRule。
+        processes > 1 时新名称在进程池中计算（只传递文件名），冲突处理仍在本进程按顺序进行；
+        需要文件元数据的规则和普通函数不支持，此时忽略该参数。
+        per_directory 时文件序号（编号、模板中的 counter）在每个目录中从头开始，
+        文件先按目录分组，此时不使用进程池。
+        """
+        if isinstance(rename_func, RenameRule):
+            if kwargs:
+                raise TypeError("使用 RenameRule 时不能再传入参数")
+            rule = rename_func
+        else:
+            # patterns 中的函数有等价规则时改用规则的批量求值
+            rule = rule_for_function(rename_func, **kwargs)
+
+        if rule is not None and per_directory:
+            named = itertools.chain.from_iterable(
+                self._iter_named(group, rule) for group in self._group_by_directory(files)
+            )
+        elif rule is not None and processes > 1 and supports_processes(rule):
+            named = iter_named_processes(files, rule, processes)
+        elif rule is not None:
+            named = self._iter_named(files, rule)
+        else:
+            named = ((file_path, rename_func(file_path, **kwargs)) for file_path in files)
+        grouped = per_directory or not isinstance(files, Sequence) or self._is_grouped(files)
+        plan = self._iter_plan(named) if grouped else self._plan_by_directory(named)
+        if self.metrics is not None:
+            return self.metrics.timed("preview", plan)
+        return plan
+    
+    @staticmethod
+    def _is_grouped(files: Sequence[Path]) -> bool:
+        # 同一目录的文件是否都连续出现
+        seen = set()
+        current = None
         for file_path in files:
-            new_name = rename_func(file_path, **kwargs)
-            new_path = file_path.parent / new_name
+            directory = os.path.dirname(os.fspath(file_path))
+            if directory != current:
+                if directory in seen:
+                    return False
+                seen.add(directory)
+                current = directory
+        return True
+    
+    def _iter_named(self, files: Iterable[Path], rule: RenameRule) -> Iterator[Tuple[Path, str]]:
+        # 按批拆分文件名后整体求值，需要元数据的规则在每批之前并行预取
+        self._bind(rule)
+        offset = 0
+        it = iter(files)
+        while True:
+            batch = list(itertools.islice(it, PREVIEW_BATCH_SIZE))
+            if not batch:
+                return
+            if rule.needs_stat:
+                self.stats.prefetch(batch)
+            yield from zip(batch, rule.apply_batch(batch, NameColumns.from_paths(batch), offset))
+            offset += len(batch)
+    
+    @staticmethod
+    def _group_by_directory(files: Iterable[Path]) -> List[List[Path]]:
+        # 按目录第一次出现的顺序分组，目录内保持原顺序
+        groups = {}
+        for file_path in files:
+            groups.setdefault(os.path.dirname(os.fspath(file_path)), []).append(file_path)
+        return list(groups.values())
+    
+    def _bind(self, rule: RenameRule):
+        if rule.needs_stat:
+            rule.bind_stats(self.stats)
+        if rule.needs_metadata:
+            rule.bind_metadata(self.metadata_cache)
+    
+    def preview_incremental(
+        self,
+        files: Iterable[Path],
+        rule: RenameRule,
+        per_directory: bool = False
+    ) -> RenamePlan:
+        """与 preview_rename 结果相同，但复用上次预览的结果，只重新计算变化的部分。
 
-            new_path = self._resolve_conflict(new_path, file_path)
-            
-            results.append((file_path, new_path))
-        
-        return results
+        适合参数随输入变化的实时预览；规则必须是编译好的 RenameRule。
+        """
+        self._bind(rule)
+        with self._phase("preview_incremental"):
+            if per_directory and rule.uses_index:
+                plan = RenamePlan()
+                for group in self._group_by_directory(files):
+                    plan.extend(self.preview_cache.preview(group, rule))
+                return plan
+            return RenamePlan(self.preview_cache.preview(files, rule))
+    
+    def iter_preview_number_rename(
+        self,
+        files: Iterable[Path],
+        start: int = 1,
+        digits: int = 3,
+        prefix: str = "",
+        keep_original: bool = False,
+        sort_by: Optional[str] = None,
+        reverse: bool = False,
+        per_directory: bool = False
+    ) -> Iterator[Tuple[Path, Path]]:
+
+        if sort_by is not None or per_directory:
+            files = self.sort_files(files, sort_by, reverse, per_directory)
+        return self.iter_preview(
+            files, NumberRule(start, digits, prefix, keep_original), per_directory=per_directory
+        )
+    
+    def _iter_plan(self, named: Iterable[Tuple[Path, str]]) -> Iterator[Tuple[Path, Path]]:
+        # 连续的同目录文件作为一段一起规划，所有段共用一个名称索引
+        index = NameIndex()
+        chunk = []
+        chunk_dir = None
+        try:
+            for file_path, new_name in named:
+                # 用字符串比较目录，避免每个文件都构造 Path.parent
+                directory = os.path.dirname(os.fspath(file_path))
+                if chunk and directory != chunk_dir:
+                    yield from self._plan_chunk(chunk, index)
+                    chunk = []
+                chunk_dir = directory
+                chunk.append((file_path, new_name))
+            if chunk:
+                yield from self._plan_chunk(chunk, index)
+        finally:
+            if self.metrics is not None:
+                self.metrics.count("listdir", index.listings)
+                self.metrics.count("conflict_probes", index.probes)
+    
+    def _plan_by_directory(self, named: Iterable[Tuple[Path, str]]) -> Iterator[Tuple[Path, Path]]:
+        # 交错的输入：同一目录的文件一起规划，本次改名的原名要在解析任何目标之前全部释放
+        named = list(named)
+        by_dir = {}
+        for i, (file_path, _) in enumerate(named):
+            by_dir.setdefault(os.path.dirname(os.fspath(file_path)), []).append(i)
+
+        index = NameIndex()
+        planned = [None] * len(named)
+        try:
+            for indices in by_dir.values():
+                chunk = self._plan_chunk([named[i] for i in indices], index)
+                for i, entry in zip(indices, chunk):
+                    planned[i] = entry
+        finally:
+            if self.metrics is not None:
+                self.metrics.count("listdir", index.listings)
+                self.metrics.count("conflict_probes", index.probes)
+        yield from planned
+    
+    def _plan_chunk(
+        self,
+        named: List[Tuple[Path, str]],
+        index: NameIndex
+    ) -> Iterator[Tuple[Path, Path]]:
+        # 同一段的文件都在同一个目录中
+        parent = named[0][0].parent
+        # 规则得到空名称（例如删掉了全部字符）时保留原名，否则目标会变成目录本身
+        named = [
+            (file_path, name if name not in ("", ".", "..") else file_path.name)
+            for file_path, name in named
+        ]
+
+        # 本次会被改名的文件不再占用原名，链式和互换的重命名因此不会被加上后缀
+        for file_path, name in named:
+            if name_key(name) != name_key(file_path.name):
+                index.release_name(parent, file_path.name)
+
+        for file_path, name in named:
+            if os.sep in name or (os.altsep and os.altsep in name):
+                # 名称中带路径分隔符时目标不在本目录，按完整路径处理
+                yield file_path, self._resolve_conflict(parent / name, file_path, index)
+                continue
+            resolved = index.resolve_name(parent, name, file_path.name)
+            yield file_path, file_path if resolved == file_path.name else parent / resolved
     
     def execute_rename(
         self, 
-        rename_list: List[Tuple[Path, Path]],
-        save_history: bool = True
+        rename_list: Iterable[Tuple[Path, Path]],
+        save_history: bool = True,
+        workers: int = 1,
+        progress: Optional[Callable[[int, int], None]] = None,
+        cancel: Optional[threading.Event] = None
     ) -> Tuple[int, List[str]]:
 
-        success_count = 0
-        errors = []
+        if not isinstance(rename_list, RenamePlan):
+            rename_list = RenamePlan(rename_list)
+        # 只为真正改名的条目构造 Path，历史记录直接使用计划中的字符串
+        completed, failures = self._run_renames(
+            rename_list.iter_changed(), workers, progress=progress, cancel=cancel
+        )
+        errors = [f"重命名失败 {old_path.name}: {str(e)}" for old_path, e in failures]
+
         operation_record = {
             "timestamp": datetime.now().isoformat(),
-            "operations": []
+            "operations": [
+                {"old": old_path, "new": new_path}
+                for old_path, new_path in rename_list.iter_strings()
+                if old_path in completed
+            ]
         }
-        
-        for old_path, new_path in rename_list:
-            try:
-                old_path.rename(new_path)
-                success_count += 1
-                operation_record["operations"].append({
-                    "old": str(old_path),
-                    "new": str(new_path)
-                })
-                
-            except Exception as e:
-                errors.append(f"重命名失败 {old_path.name}: {str(e)}")
+        success_count = len(operation_record["operations"])
 
         if save_history and success_count > 0:
-            self.history.append(operation_record)
-            self._save_history()
+            with self._phase("history_save"):
+                self.journal.append(operation_record)
         
         return success_count, errors
     
-    def undo_last_operation(self) -> Tuple[bool, str]:
+    def undo_last_operation(self, count: int = 1, workers: int = 1) -> Tuple[bool, str]:
+        """撤销最近 count 次操作，合并成一个计划执行（与执行重命名使用同一套调度）。
 
-        if not self.history:
+        已经不存在的文件被跳过；其它没能改回的文件作为一条部分撤销的记录留在历史中，
+        下次撤销时再重试。
+        """
+        if self.has_pending():
+            return False, str(PendingPlanError())
+        with self._phase("history_load"):
+            records = self.journal.records(count)
+        if not records:
             return False, "没有可撤销的操作"
-        
-        last_operation = self.history[-1]
-        success_count = 0
+
+        composed = compose_undo(records)
+        reverse_list = [(Path(current), Path(original)) for current, original in composed]
+        completed, failures = self._run_renames(
+            reverse_list, workers, kind="undo", records=len(records)
+        )
+        success_count = len(completed)
+
+        # 不预先检查文件是否存在，失败后再区分源文件已不存在的情况
         errors = []
+        missing = set()
+        for current, e in failures:
+            if isinstance(e, FileNotFoundError) and not os.path.lexists(current):
+                missing.add(os.fspath(current))
+                errors.append(f"文件不存在: {current.name}")
+            else:
+                errors.append(f"撤销失败 {current.name}: {str(e)}")
 
-        for op in reversed(last_operation["operations"]):
-            try:
-                new_path = Path(op["new"])
-                old_path = Path(op["old"])
-                
-                if new_path.exists():
-                    new_path.rename(old_path)
-                    success_count += 1
-                else:
-                    errors.append(f"文件不存在: {new_path.name}")
-                    
-            except Exception as e:
-                errors.append(f"撤销失败 {new_path.name}: {str(e)}")
-        
         if success_count > 0:
-            self.history.pop()
-            self._save_history()
+            self._finish_undo(records, composed, completed, missing)
             message = f"成功撤销 {success_count} 个文件"
             if errors:
                 message += f"\n失败 {len(errors)} 个"
             return True, message
         else:
             return False, "撤销失败: " + "; ".join(errors)
+
+    def _finish_undo(self, records: List[dict], composed: List[Tuple[str, str]], completed: set, missing=()):
+        # 撤销的记录出栈；没能改回的文件作为一条部分撤销的记录放回去
+        remainder = [
+            {"old": original, "new": current}
+            for current, original in reversed(composed)
+            if current not in completed and current not in missing
+        ]
+        for _ in records:
+            self.journal.pop()
+        if remainder:
+            self.journal.append({
+                "timestamp": records[-1]["timestamp"],
+                "operations": remainder,
+                "partial": True
+            })
     
-    def _resolve_conflict(self, new_path: Path, original_path: Path) -> Path:
-        if new_path == original_path:
-            return new_path
+    def _run_renames(
+        self,
+        rename_list: Iterable[Tuple[Path, Path]],
+        workers: int = 1,
+        kind: str = "execute",
+        progress: Optional[Callable[[int, int], None]] = None,
+        cancel: Optional[threading.Event] = None,
+        records: int = 1
+    ):
+        # 返回 (已完成的源路径集合, [(源路径, 异常)])
+        # 中断的计划还在日志中时不能开始新的重命名，begin 会覆盖它
+        if self.has_pending():
+            raise PendingPlanError()
+        groups, duplicates = schedule_renames(rename_list)
+        failures = [
+            (old_path, FileExistsError(f"目标名称重复: {new_path.name}"))
+            for old_path, new_path in duplicates
+        ]
 
-        if not new_path.exists():
-            return new_path
+        # 先把计划写入预写日志，进程中途退出后可以 resume 或 rollback
+        wal_open = False
+        if groups:
+            try:
+                self.wal.begin(groups, kind, records)
+                wal_open = True
+            except OSError:
+                pass
+
+        total = sum(len(group) for group in groups)
+        counter = itertools.count(1)
+
+        metrics = self.metrics
+
+        def on_step(gi, si):
+            if metrics is not None and si >= 0:
+                metrics.count("rename")
+            if wal_open:
+                self.wal.mark(gi, si)
+            if progress is not None and si >= 0:
+                done_steps = next(counter)
+                if done_steps % PROGRESS_INTERVAL == 0 or done_steps == total:
+                    progress(done_steps, total)
+
+        # 目录内容即将变化，缓存的预览结果作废
+        self.preview_cache.invalidate()
+        try:
+            with self._phase(kind):
+                done, group_failures = run_groups(groups, workers, on_step, cancel)
+        except BaseException:
+            # 保留日志，留给 resume / rollback 处理
+            if wal_open:
+                self.wal.close()
+            raise
+        if wal_open:
+            self.wal.commit()
+
+        completed = {os.fspath(step.origin) for step in done}
+        failures.extend((step.origin, e) for step, e in group_failures)
+        if metrics is not None:
+            for _, e in failures:
+                metrics.error(e)
+        for key in completed:
+            self.stats.discard(key)
 
-        stem = new_path.stem
-        suffix = new_path.suffix
+        return completed, failures
+    
+    def has_pending(self) -> bool:
+        return self.wal.has_pending()
+    
+    def resume(self) -> Tuple[int, List[str]]:
+        """继续执行上次中断的重命名计划。"""
+        plan = self.wal.load()
+        if plan is None:
+            return 0, []
+
+        self.preview_cache.invalidate()
+        self.wal.attach(plan)
+        operations = []
+        errors = []
+        try:
+            for gi, group in enumerate(plan.groups):
+                done = plan.locate(gi)
+                operations.extend(step for step in group[:done] if step.final)
+                if gi in plan.aborted or done >= len(group):
+                    continue
+
+                on_step = lambda si, gi=gi, offset=done: self.wal.mark(gi, si if si < 0 else si + offset)
+                finished, failures = run_group(group[done:], on_step)
+                operations.extend(finished)
+                errors.extend(f"重命名失败 {step.source.name}: {str(e)}" for step, e in failures)
+        finally:
+            self.wal.close()
+
+        if plan.kind == "undo":
+            if operations:
+                # 中断前没有改回的文件仍然留在历史中
+                records = self.journal.records(plan.records)
+                completed = {os.fspath(step.origin) for step in operations}
+                self._finish_undo(records, compose_undo(records), completed)
+        elif operations:
+            self.journal.append({
+                "timestamp": plan.timestamp,
+                "operations": [
+                    {"old": str(step.origin), "new": str(step.target)}
+                    for step in operations
+                ]
+            })
+
+        self.wal.commit()
+        return len(operations), errors
+    
+    def rollback(self) -> Tuple[int, List[str]]:
+        """撤销上次中断的重命名计划中已经完成的部分。"""
+        plan = self.wal.load()
+        if plan is None:
+            return 0, []
+
+        self.preview_cache.invalidate()
+        count = 0
+        errors = []
+        for gi, group in enumerate(plan.groups):
+            done = plan.locate(gi)
+            failures = rollback_group(group, done)
+            count += sum(1 for step in group[:done] if step.final) if not failures else 0
+            errors.extend(f"回滚失败 {step.target.name}: {str(e)}" for step, e in failures)
+
+        self.wal.commit()
+        return count, errors
+    
+    def _resolve_conflict(
+        self,
+        new_path: Path,
+        original_path: Path,
+        index: Optional[NameIndex] = None
+    ) -> Path:
+        if index is not None:
+            return index.resolve(new_path, original_path)
+
+        # 单独调用时不列举整个目录，逐个检查候选名是否存在
+        if new_path == original_path or not new_path.exists():
+            return new_path
+        stem, suffix = split_name(new_path.name)
         parent = new_path.parent
         counter = 1
-        
         while new_path.exists() and new_path != original_path:
-            new_name = f"{stem}_{counter}{suffix}"
-            new_path = parent / new_name
+            new_path = parent / f"{stem}_{counter}{suffix}"
             counter += 1
-        
         return new_path
     
-    def _load_history(self):
-        try:
-            if self.history_file.exists():
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    self.history = json.load(f)
-                    # 只保留最近50条记录
-                    self.history = self.history[-50:]
-        except Exception:
-            self.history = []
-    
-    def _save_history(self):
-        try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history[-50:], f, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
-    
     def get_history(self, limit: int = 10) -> List[dict]:
-        return self.history[-limit:]
+        with self._phase("history_load"):
+            return self.journal.records(limit)
     
     def clear_history(self):
-        self.history = []
-        self._save_history()
+        self.journal.clear()
@@ -0,0 +1,122 @@
+import os
+import re
+import fnmatch
+from typing import Callable, Iterable, Optional, Union
+
+
+def _compile_globs(globs: Iterable[str]) -> Optional[Callable[[str], Optional[re.Match]]]:
+    # 多个通配符合并成一个正则，每个名称只匹配一次；与 pathlib.glob 一致，Windows 下不区分大小写
+    globs = list(globs)
+    if not globs:
+        return None
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    return re.compile("|".join(f"(?:{fnmatch.translate(glob)})" for glob in globs), flags).match
+
+
+def is_path_pattern(spec: str) -> bool:
+    """包含路径的匹配模式（如 "sub/*.txt"、"**/*.jpg"）不能在目录遍历中按文件名匹配。"""
+    for term in spec.split(";"):
+        term = term.strip()
+        if term and not term.startswith("!") and ("/" in term or os.sep in term or "**" in term):
+            return True
+    return False
+
+
+class FileFilter:
+    """扫描时使用的过滤条件，构造时编译一次，在目录遍历中逐项判断。
+
+    include / exclude 是文件名通配符，regex 在文件名中搜索；
+    min_size / max_size 以字节计，newer_than / older_than 是修改时间的时间戳。
+    prune_dirs 是目录名通配符，命中的子目录不会进入，也不会被列举。
+    """
+
+    def __init__(
+        self,
+        include: Iterable[str] = ("*",),
+        exclude: Iterable[str] = (),
+        regex: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        newer_than: Optional[float] = None,
+        older_than: Optional[float] = None,
+        prune_dirs: Iterable[str] = ()
+    ):
+        self.include = tuple(include) or ("*",)
+        self.exclude = tuple(exclude)
+        self.regex = regex or None
+        self.min_size = min_size
+        self.max_size = max_size
+        self.newer_than = newer_than
+        self.older_than = older_than
+        self.prune_dirs = tuple(prune_dirs)
+
+        self._include = None if "*" in self.include else _compile_globs(self.include)
+        self._exclude = _compile_globs(self.exclude)
+        try:
+            self._regex = re.compile(self.regex).search if self.regex else None
+        except re.error as e:
+            raise ValueError(f"无效的正则表达式: {e}")
+        self._prune = _compile_globs(self.prune_dirs)
+        # 只有设置了大小或时间范围才需要 stat
+        self.needs_stat = any(
+            bound is not None for bound in (min_size, max_size, newer_than, older_than)
+        )
+
+    @classmethod
+    def parse(cls, spec: str, **kwargs) -> "FileFilter":
+        """解析文件类型输入框中的写法："*.jpg;*.png;!*.tmp;!node_modules/"。
+
+        以分号分隔；"!" 开头的是排除的文件名，再以 "/" 结尾的是不进入的目录。
+        kwargs 中的 exclude 和 prune_dirs 与解析结果合并，其余参数原样传给构造函数。
+        """
+        include = []
+        exclude = list(kwargs.pop("exclude", ()))
+        prune_dirs = list(kwargs.pop("prune_dirs", ()))
+        for term in spec.split(";"):
+            term = term.strip()
+            if not term:
+                continue
+            if not term.startswith("!"):
+                include.append(term)
+            elif term.endswith("/") or term.endswith(os.sep):
+                prune_dirs.append(term[1:].rstrip("/" + os.sep))
+            else:
+                exclude.append(term[1:])
+        return cls(include, exclude, prune_dirs=prune_dirs, **kwargs)
+
+    def _key(self) -> tuple:
+        return (self.include, self.exclude, self.regex, self.min_size, self.max_size,
+                self.newer_than, self.older_than, self.prune_dirs)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, FileFilter):
+            return self._key() == other._key()
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def match_name(self, name: str) -> bool:
+        if self._include is not None and not self._include(name):
+            return False
+        if self._exclude is not None and self._exclude(name):
+            return False
+        return self._regex is None or self._regex(name) is not None
+
+    def match_stat(self, st: os.stat_result) -> bool:
+        if self.min_size is not None and st.st_size < self.min_size:
+            return False
+        if self.max_size is not None and st.st_size > self.max_size:
+            return False
+        if self.newer_than is not None and st.st_mtime < self.newer_than:
+            return False
+        if self.older_than is not None and st.st_mtime > self.older_than:
+            return False
+        return True
+
+    def prunes(self, name: str) -> bool:
+        return self._prune is not None and self._prune(name) is not None
+
+
+def as_filter(pattern: Union[str, FileFilter]) -> FileFilter:
+    return pattern if isinstance(pattern, FileFilter) else FileFilter.parse(pattern)
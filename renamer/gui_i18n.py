@@ -3,10 +3,26 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 from pathlib import Path
 from typing import List
 import json
+import queue
+import threading
 
 from .core import FileRenamer
-from . import patterns
+from .plan import RenamePlan
+from .rules import compile_rule
+from .ordering import SORT_KEYS
 from .i18n import get_text, LANGUAGES
+from .virtual_list import VirtualListView
+
+
+# 后台任务消息的轮询间隔和每次最多处理的消息数
+POLL_INTERVAL_MS = 50
+MAX_MESSAGES_PER_POLL = 200
+# 预览时每处理多少个文件报告一次进度
+PROGRESS_INTERVAL = 500
+# 实时预览在输入停止多久后触发
+LIVE_PREVIEW_DELAY_MS = 300
+# 监视模式下多久同步一次文件变化
+WATCH_INTERVAL_MS = 1000
 
 
 class BatchRenamerGUI:
@@ -24,7 +40,18 @@ class BatchRenamerGUI:
         self.renamer = FileRenamer()
         self.current_directory = None
         self.current_files = []
-        self.preview_results = []
+        self.listed_directory = None
+        self.preview_results = RenamePlan()
+        self.rule_chain = []
+        self.live_preview_job = None
+        self.watcher = None
+        self.watch_job = None
+        
+        # 后台任务
+        self.task_thread = None
+        self.task_queue = None
+        self.cancel_event = None
+        self.task_callbacks = None
         
         # 设置样式
         self.setup_style()
@@ -37,6 +64,9 @@ class BatchRenamerGUI:
         self.root.bind('<Control-p>', lambda e: self.preview_rename())
         self.root.bind('<Control-r>', lambda e: self.execute_rename())
         self.root.bind('<Control-z>', lambda e: self.undo_operation())
+        
+        # 检查上次是否有中断的重命名
+        self.root.after(100, lambda: self.check_pending_operation(startup=True))
     
     def load_language_preference(self):
         """加载语言偏好 - Load language preference"""
@@ -141,6 +171,13 @@ class BatchRenamerGUI:
             command=self.undo_operation
         ).pack(side=tk.LEFT, padx=2)
         
+        # 恢复中断的重命名
+        ttk.Button(
+            toolbar,
+            text=get_text('recover', self.lang),
+            command=self.check_pending_operation
+        ).pack(side=tk.LEFT, padx=2)
+        
         # 分隔符
         ttk.Separator(toolbar, orient=tk.VERTICAL).pack(side=tk.LEFT, fill=tk.Y, padx=10)
         
@@ -188,8 +225,11 @@ class BatchRenamerGUI:
         pattern_combo = ttk.Combobox(
             filter_frame, 
             textvariable=self.file_pattern,
-            values=["*", "*.jpg", "*.png", "*.txt", "*.pdf", "*.mp3", "*.mp4"],
-            width=15
+            values=[
+                "*", "*.jpg;*.jpeg;*.png", "*.txt", "*.pdf", "*.mp3", "*.mp4",
+                "*;!.*;!.git/;!node_modules/"
+            ],
+            width=24
         )
         pattern_combo.pack(side=tk.LEFT, padx=(0, 10))
         
@@ -201,6 +241,14 @@ class BatchRenamerGUI:
             command=self.refresh_files
         ).pack(side=tk.LEFT)
         
+        self.watch_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            filter_frame, 
+            text=get_text('watch_changes', self.lang), 
+            variable=self.watch_var,
+            command=self.toggle_watch
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
         # 文件列表和预览对比
         list_notebook = ttk.Notebook(left_frame)
         list_notebook.pack(fill=tk.BOTH, expand=True)
@@ -209,26 +257,15 @@ class BatchRenamerGUI:
         original_frame = ttk.Frame(list_notebook)
         list_notebook.add(original_frame, text=get_text('original_files', self.lang))
         
-        self.file_listbox = tk.Listbox(
-            original_frame, 
-            selectmode=tk.EXTENDED,
-            font=('Courier', 9)
-        )
-        self.file_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        scrollbar = ttk.Scrollbar(original_frame, command=self.file_listbox.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.file_listbox.config(yscrollcommand=scrollbar.set)
+        # 只渲染可见行，数十万文件也不会撑爆控件
+        self.file_listbox = VirtualListView(original_frame, self.render_file_rows)
+        self.file_listbox.pack(fill=tk.BOTH, expand=True)
         
         # 预览对比标签页
         preview_frame = ttk.Frame(list_notebook)
         list_notebook.add(preview_frame, text=get_text('preview_comparison', self.lang))
         
-        self.preview_text = scrolledtext.ScrolledText(
-            preview_frame,
-            font=('Courier', 9),
-            wrap=tk.NONE
-        )
+        self.preview_text = VirtualListView(preview_frame, self.render_preview_rows, selectable=False)
         self.preview_text.pack(fill=tk.BOTH, expand=True)
         
         # 文件统计
@@ -272,6 +309,9 @@ class BatchRenamerGUI:
             (get_text('mode_datetime', self.lang), "datetime"),
             (get_text('mode_remove', self.lang), "remove"),
             (get_text('mode_insert', self.lang), "insert"),
+            (get_text('mode_hash', self.lang), "hash"),
+            (get_text('mode_mediadate', self.lang), "mediadate"),
+            (get_text('mode_template', self.lang), "template"),
         ]
         
         ttk.Label(scrollable_frame, text=get_text('rename_mode', self.lang), font=('Arial', 10, 'bold')).pack(anchor=tk.W, pady=(0, 5))
@@ -285,17 +325,34 @@ class BatchRenamerGUI:
                 command=self.update_options_visibility
             ).pack(anchor=tk.W)
         
+        self.live_preview_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            scrollable_frame,
+            text=get_text('live_preview', self.lang),
+            variable=self.live_preview_var,
+            command=self.schedule_live_preview
+        ).pack(anchor=tk.W, pady=(5, 0))
+        
         ttk.Separator(scrollable_frame, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
         
         # 各种模式的选项
-        self.create_prefix_options(scrollable_frame)
-        self.create_suffix_options(scrollable_frame)
-        self.create_replace_options(scrollable_frame)
-        self.create_number_options(scrollable_frame)
-        self.create_case_options(scrollable_frame)
-        self.create_datetime_options(scrollable_frame)
-        self.create_remove_options(scrollable_frame)
-        self.create_insert_options(scrollable_frame)
+        mode_container = ttk.Frame(scrollable_frame)
+        mode_container.pack(fill=tk.X)
+        self.create_prefix_options(mode_container)
+        self.create_suffix_options(mode_container)
+        self.create_replace_options(mode_container)
+        self.create_number_options(mode_container)
+        self.create_case_options(mode_container)
+        self.create_datetime_options(mode_container)
+        self.create_remove_options(mode_container)
+        self.create_insert_options(mode_container)
+        self.create_hash_options(mode_container)
+        self.create_mediadate_options(mode_container)
+        self.create_template_options(mode_container)
+        self.bind_live_preview(mode_container)
+        
+        # 规则链
+        self.create_chain_options(scrollable_frame)
         
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
@@ -382,6 +439,34 @@ class BatchRenamerGUI:
             text=get_text('keep_original', self.lang), 
             variable=self.number_keep
         ).grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
+        # 编号顺序：显示名称 -> 排序键，None 表示按列表顺序
+        self.sort_choices = {get_text('sort_selection', self.lang): None}
+        for key in SORT_KEYS:
+            self.sort_choices[get_text('sort_' + key, self.lang)] = key
+        ttk.Label(self.number_frame, text=get_text('sort_by', self.lang)).grid(row=4, column=0, sticky=tk.W, pady=5)
+        self.number_sort = tk.StringVar(value=get_text('sort_name', self.lang))
+        ttk.Combobox(
+            self.number_frame,
+            textvariable=self.number_sort,
+            values=list(self.sort_choices),
+            state='readonly',
+            width=27
+        ).grid(row=4, column=1, pady=5)
+        
+        self.number_reverse = tk.BooleanVar()
+        ttk.Checkbutton(
+            self.number_frame,
+            text=get_text('sort_reverse', self.lang),
+            variable=self.number_reverse
+        ).grid(row=5, column=0, columnspan=2, sticky=tk.W, pady=5)
+        
+        self.number_per_directory = tk.BooleanVar()
+        ttk.Checkbutton(
+            self.number_frame,
+            text=get_text('per_directory', self.lang),
+            variable=self.number_per_directory
+        ).grid(row=6, column=0, columnspan=2, sticky=tk.W, pady=5)
     
     def create_case_options(self, parent):
         """创建大小写选项 - Create case options"""
@@ -502,22 +587,205 @@ class BatchRenamerGUI:
             value=-1
         ).pack(side=tk.LEFT)
     
+    def create_hash_options(self, parent):
+        """创建内容摘要选项 - Create content hash options"""
+        self.hash_frame = ttk.LabelFrame(parent, text=get_text('hash_settings', self.lang), padding=10)
+        
+        ttk.Label(self.hash_frame, text=get_text('hash_algorithm', self.lang)).grid(row=0, column=0, sticky=tk.W, pady=5)
+        self.hash_algorithm = tk.StringVar(value="sha1")
+        ttk.Combobox(
+            self.hash_frame,
+            textvariable=self.hash_algorithm,
+            values=["md5", "sha1", "sha256", "blake2b"],
+            state="readonly",
+            width=27
+        ).grid(row=0, column=1, pady=5)
+        
+        ttk.Label(self.hash_frame, text=get_text('hash_length', self.lang)).grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.hash_length = tk.IntVar(value=12)
+        ttk.Spinbox(
+            self.hash_frame,
+            from_=0,
+            to=128,
+            textvariable=self.hash_length,
+            width=28
+        ).grid(row=1, column=1, pady=5)
+        
+        ttk.Label(self.hash_frame, text=get_text('hash_read_kb', self.lang)).grid(row=2, column=0, sticky=tk.W, pady=5)
+        self.hash_read_kb = tk.IntVar(value=0)
+        ttk.Spinbox(
+            self.hash_frame,
+            from_=0,
+            to=1048576,
+            textvariable=self.hash_read_kb,
+            width=28
+        ).grid(row=2, column=1, pady=5)
+        
+        ttk.Label(self.hash_frame, text=get_text('prefix', self.lang)).grid(row=3, column=0, sticky=tk.W, pady=5)
+        self.hash_prefix = ttk.Entry(self.hash_frame, width=30)
+        self.hash_prefix.grid(row=3, column=1, pady=5)
+        
+        self.hash_keep = tk.BooleanVar()
+        ttk.Checkbutton(
+            self.hash_frame,
+            text=get_text('keep_original', self.lang),
+            variable=self.hash_keep
+        ).grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=5)
+    
+    def create_mediadate_options(self, parent):
+        """创建拍摄日期选项 - Create capture date options"""
+        self.mediadate_frame = ttk.LabelFrame(parent, text=get_text('mediadate_settings', self.lang), padding=10)
+        
+        ttk.Label(self.mediadate_frame, text=get_text('date_format', self.lang)).grid(row=0, column=0, sticky=tk.W, pady=5)
+        self.mediadate_format = tk.StringVar(value="%Y%m%d_%H%M%S")
+        ttk.Combobox(
+            self.mediadate_frame,
+            textvariable=self.mediadate_format,
+            values=[
+                "%Y%m%d_%H%M%S",
+                "%Y-%m-%d_%H-%M-%S",
+                "%Y%m%d",
+                "%Y-%m-%d",
+                "%Y%m%d%H%M%S"
+            ],
+            width=27
+        ).grid(row=0, column=1, pady=5)
+        
+        ttk.Label(self.mediadate_frame, text=get_text('prefix', self.lang)).grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.mediadate_prefix = ttk.Entry(self.mediadate_frame, width=30)
+        self.mediadate_prefix.grid(row=1, column=1, pady=5)
+        
+        ttk.Label(self.mediadate_frame, text=get_text('suffix', self.lang)).grid(row=2, column=0, sticky=tk.W, pady=5)
+        self.mediadate_suffix = ttk.Entry(self.mediadate_frame, width=30)
+        self.mediadate_suffix.grid(row=2, column=1, pady=5)
+        
+        self.mediadate_fallback = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            self.mediadate_frame,
+            text=get_text('fallback_to_mtime', self.lang),
+            variable=self.mediadate_fallback
+        ).grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=2)
+        
+        self.mediadate_keep = tk.BooleanVar()
+        ttk.Checkbutton(
+            self.mediadate_frame,
+            text=get_text('keep_original', self.lang),
+            variable=self.mediadate_keep
+        ).grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=5)
+    
+    def create_template_options(self, parent):
+        """创建模板选项 - Create template options"""
+        self.template_frame = ttk.LabelFrame(parent, text=get_text('template_settings', self.lang), padding=10)
+        
+        ttk.Label(self.template_frame, text=get_text('template', self.lang)).grid(row=0, column=0, sticky=tk.W, pady=5)
+        self.template_text = tk.StringVar(value="{date:%Y%m%d}_{counter:03}_{stem|lower}{ext}")
+        ttk.Combobox(
+            self.template_frame,
+            textvariable=self.template_text,
+            values=[
+                "{date:%Y%m%d}_{counter:03}_{stem|lower}{ext}",
+                "{taken:%Y-%m-%d_%H%M%S}{ext}",
+                "{parent}_{counter:04}{ext}",
+                "{hash:.12}{ext|lower}",
+            ],
+            width=27
+        ).grid(row=0, column=1, pady=5)
+        
+        ttk.Label(self.template_frame, text=get_text('start_number', self.lang)).grid(row=1, column=0, sticky=tk.W, pady=5)
+        self.template_start = tk.IntVar(value=1)
+        ttk.Spinbox(
+            self.template_frame,
+            from_=0,
+            to=9999,
+            textvariable=self.template_start,
+            width=28
+        ).grid(row=1, column=1, pady=5)
+        
+        ttk.Label(
+            self.template_frame,
+            text=get_text('template_hint', self.lang),
+            wraplength=340,
+            foreground='gray'
+        ).grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=5)
+    
+    def create_chain_options(self, parent):
+        """创建规则链选项 - Create rule chain options"""
+        chain_frame = ttk.LabelFrame(parent, text=get_text('chain_settings', self.lang), padding=10)
+        chain_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(
+            chain_frame,
+            text=get_text('chain_hint', self.lang),
+            wraplength=340
+        ).pack(anchor=tk.W, pady=(0, 5))
+        
+        self.chain_listbox = tk.Listbox(chain_frame, height=5, font=('Courier', 9))
+        self.chain_listbox.pack(fill=tk.X)
+        
+        button_frame = ttk.Frame(chain_frame)
+        button_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Button(
+            button_frame,
+            text=get_text('chain_add', self.lang),
+            command=self.add_chain_step
+        ).pack(side=tk.LEFT, padx=2)
+        ttk.Button(
+            button_frame,
+            text=get_text('chain_remove', self.lang),
+            command=self.remove_chain_step
+        ).pack(side=tk.LEFT, padx=2)
+        ttk.Button(
+            button_frame,
+            text=get_text('chain_clear', self.lang),
+            command=self.clear_chain
+        ).pack(side=tk.LEFT, padx=2)
+    
     def create_statusbar(self):
         """创建底部状态栏 - Create status bar"""
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        self.cancel_button = ttk.Button(
+            status_frame,
+            text=get_text('cancel', self.lang),
+            command=self.cancel_task,
+            state=tk.DISABLED
+        )
+        self.cancel_button.pack(side=tk.RIGHT, padx=2)
+        
+        self.progress_bar = ttk.Progressbar(status_frame, length=200, mode='determinate')
+        self.progress_bar.pack(side=tk.RIGHT, padx=2)
+        
+        # 性能统计（默认关闭）
+        ttk.Button(
+            status_frame,
+            text=get_text('export_metrics', self.lang),
+            command=self.export_metrics
+        ).pack(side=tk.RIGHT, padx=2)
+        
+        self.metrics_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            status_frame,
+            text=get_text('metrics', self.lang),
+            variable=self.metrics_var,
+            command=self.toggle_metrics
+        ).pack(side=tk.RIGHT, padx=2)
+        
         self.statusbar = ttk.Label(
-            self.root, 
+            status_frame, 
             text=get_text('status_ready', self.lang), 
             relief=tk.SUNKEN, 
             anchor=tk.W
         )
-        self.statusbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.statusbar.pack(side=tk.LEFT, fill=tk.X, expand=True)
     
     def update_options_visibility(self):
         """根据选择的模式更新选项面板的可见性"""
         # 隐藏所有选项框
         for frame in [self.prefix_frame, self.suffix_frame, self.replace_frame,
                      self.number_frame, self.case_frame, self.datetime_frame,
-                     self.remove_frame, self.insert_frame]:
+                     self.remove_frame, self.insert_frame, self.hash_frame,
+                     self.mediadate_frame, self.template_frame]:
             frame.pack_forget()
         
         # 显示当前模式的选项框
@@ -538,6 +806,113 @@ class BatchRenamerGUI:
             self.remove_frame.pack(fill=tk.X, pady=5)
         elif mode == "insert":
             self.insert_frame.pack(fill=tk.X, pady=5)
+        elif mode == "hash":
+            self.hash_frame.pack(fill=tk.X, pady=5)
+        elif mode == "mediadate":
+            self.mediadate_frame.pack(fill=tk.X, pady=5)
+        elif mode == "template":
+            self.template_frame.pack(fill=tk.X, pady=5)
+        
+        self.schedule_live_preview()
+    
+    def bind_live_preview(self, widget):
+        """选项变化时触发实时预览 - Trigger live preview when an option changes"""
+        for event in ('<KeyRelease>', '<ButtonRelease-1>', '<<ComboboxSelected>>'):
+            widget.bind(event, self.schedule_live_preview, add='+')
+        for child in widget.winfo_children():
+            self.bind_live_preview(child)
+    
+    def schedule_live_preview(self, event=None):
+        """输入停止后再预览，连续按键只触发一次 - Debounce live preview"""
+        if self.live_preview_job is not None:
+            self.root.after_cancel(self.live_preview_job)
+            self.live_preview_job = None
+        if self.live_preview_var.get() and self.current_files:
+            self.live_preview_job = self.root.after(LIVE_PREVIEW_DELAY_MS, self.live_preview)
+    
+    def live_preview(self):
+        """增量预览，只重新计算变化的部分 - Incremental preview for live updates"""
+        self.live_preview_job = None
+        if self.task_thread is not None:
+            # 等当前任务结束后再试
+            self.schedule_live_preview()
+            return
+        
+        files = self.get_selected_files()
+        try:
+            rule = self.build_rule()
+        except Exception as e:
+            # 输入过程中参数可能暂时无效（例如未写完的正则），只在状态栏提示
+            self.update_status(get_text('preview_error', self.lang).format(str(e)))
+            return
+        sort_by, reverse, per_directory = self.get_order_params()
+        
+        def work(post, cancel):
+            ordered = files
+            if sort_by is not None or per_directory:
+                ordered = self.renamer.sort_files(files, sort_by, reverse, per_directory)
+            return self.renamer.preview_incremental(ordered, rule, per_directory)
+        
+        def on_done(results):
+            self.preview_results = results
+            self.display_preview()
+            self.rename_button.config(state=tk.NORMAL)
+            self.update_status(get_text('status_preview_complete', self.lang).format(len(results)))
+        
+        def on_error(e):
+            self.update_status(get_text('preview_error', self.lang).format(str(e)))
+        
+        self.start_task(work, on_done, on_error)
+    
+    def add_chain_step(self):
+        """把当前模式加入规则链 - Add current mode to the chain"""
+        mode = self.rename_mode.get()
+        params = self.get_rule_params(mode)
+        try:
+            compile_rule(mode, **params)
+        except ValueError as e:
+            messagebox.showerror(get_text('error', self.lang), str(e))
+            return
+        
+        self.rule_chain.append((mode, params))
+        self.refresh_chain_list()
+    
+    def remove_chain_step(self):
+        """删除选中的链步骤 - Remove selected chain step"""
+        for i in reversed(self.chain_listbox.curselection()):
+            del self.rule_chain[i]
+        self.refresh_chain_list()
+    
+    def clear_chain(self):
+        """清空规则链 - Clear chain"""
+        self.rule_chain = []
+        self.refresh_chain_list()
+    
+    def refresh_chain_list(self):
+        """刷新规则链列表 - Refresh chain list"""
+        self.chain_listbox.delete(0, tk.END)
+        for i, (mode, params) in enumerate(self.rule_chain, 1):
+            summary = ", ".join(f"{key}={value!r}" for key, value in params.items())
+            self.chain_listbox.insert(tk.END, f"{i}. {get_text('mode_' + mode, self.lang)}: {summary}")
+        self.schedule_live_preview()
+    
+    def get_order_params(self):
+        """编号模式的排序方式 - Ordering used by the number mode"""
+        if self.rule_chain or self.rename_mode.get() != "number":
+            return None, False, False
+        return (
+            self.sort_choices.get(self.number_sort.get()),
+            self.number_reverse.get(),
+            self.number_per_directory.get()
+        )
+    
+    def build_rule(self):
+        """根据规则链或当前模式编译规则 - Compile the chain or the current mode"""
+        if self.rule_chain:
+            steps = [dict(params, mode=mode) for mode, params in self.rule_chain]
+            return compile_rule("chain", steps=steps)
+        mode = self.rename_mode.get()
+        return compile_rule(mode, **self.get_rule_params(mode))
     
     def select_directory(self):
         """选择目录 - Select directory"""
@@ -552,37 +927,118 @@ class BatchRenamerGUI:
         if not self.current_directory:
             return
         
-        try:
-            pattern = self.file_pattern.get()
-            recursive = self.recursive_var.get()
-            
-            self.current_files = self.renamer.get_files(
-                self.current_directory,
-                pattern,
-                recursive
-            )
-            
-            # 更新文件列表
-            self.file_listbox.delete(0, tk.END)
-            for file_path in self.current_files:
-                rel_path = file_path.relative_to(self.current_directory)
-                self.file_listbox.insert(tk.END, str(rel_path))
-            
+        directory = self.current_directory
+        pattern = self.file_pattern.get()
+        recursive = self.recursive_var.get()
+        
+        # 监视中的同一目录只需应用积累的变化
+        watcher = self.watcher
+        if watcher is not None and self.task_thread is None and \
+                (watcher.directory, watcher.pattern, watcher.recursive) == (directory, pattern, recursive):
+            self.sync_watcher()
+            self.update_status(get_text('status_files_found', self.lang).format(len(self.current_files)))
+            return
+        
+        if self.task_thread is not None:
+            self.update_status(get_text('status_busy', self.lang))
+            return
+        
+        self.stop_watch()
+        if self.watch_var.get():
+            try:
+                watcher = self.renamer.watch(directory, pattern, recursive)
+            except ValueError as e:
+                self.watch_var.set(False)
+                messagebox.showwarning(get_text('warning', self.lang), str(e))
+                watcher = None
+        else:
+            watcher = None
+        
+        def work(post, cancel):
+            count = 0
+            batches = watcher.scan() if watcher is not None else self.renamer.iter_files(directory, pattern, recursive)
+            for batch in batches:
+                if cancel.is_set():
+                    return False
+                count += len(batch)
+                post(("partial", batch))
+                post(("progress", count, None, 'status_scanning'))
+            return True
+        
+        def on_partial(batch):
+            self.current_files.extend(batch)
+            self.file_listbox.set_count(len(self.current_files))
+        
+        def on_done(completed):
             # 全选
-            self.file_listbox.select_set(0, tk.END)
+            self.file_listbox.select_all()
             
             # 更新统计
             self.file_count_label.config(text=get_text('file_count', self.lang).format(len(self.current_files)))
-            self.update_status(get_text('status_files_found', self.lang).format(len(self.current_files)))
-            
-        except Exception as e:
+            if completed:
+                self.update_status(get_text('status_files_found', self.lang).format(len(self.current_files)))
+                if watcher is not None:
+                    self.start_watch(watcher)
+            else:
+                if watcher is not None:
+                    watcher.close()
+                self.update_status(get_text('status_cancelled', self.lang))
+        
+        def on_error(e):
+            if watcher is not None:
+                watcher.close()
             messagebox.showerror(
                 get_text('error', self.lang), 
                 get_text('refresh_error', self.lang).format(str(e))
             )
+        
+        if self.start_task(work, on_done, on_error, on_partial):
+            self.listed_directory = directory
+            self.current_files = []
+            self.file_listbox.clear()
+    
+    def toggle_watch(self):
+        """开启或关闭监视模式 - Toggle watch mode"""
+        if self.watch_var.get():
+            self.refresh_files()
+        else:
+            self.stop_watch()
+    
+    def start_watch(self, watcher):
+        """开始定期同步文件变化 - Start syncing file changes"""
+        self.watcher = watcher
+        self.watch_job = self.root.after(WATCH_INTERVAL_MS, self.poll_watcher)
+    
+    def stop_watch(self):
+        """停止监视 - Stop watching"""
+        if self.watch_job is not None:
+            self.root.after_cancel(self.watch_job)
+            self.watch_job = None
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+    
+    def poll_watcher(self):
+        """定期应用监视到的变化 - Periodically apply watched changes"""
+        # 后台任务运行时不修改文件列表，留到下一轮
+        if self.task_thread is None:
+            self.sync_watcher()
+        self.watch_job = self.root.after(WATCH_INTERVAL_MS, self.poll_watcher)
+    
+    def sync_watcher(self):
+        """把监视器的文件集合同步到列表 - Sync the list with the watcher"""
+        if not self.watcher.poll():
+            return
+        self.current_files = self.watcher.files
+        self.file_listbox.set_count(len(self.current_files))
+        self.file_listbox.select_all()
+        self.file_count_label.config(text=get_text('file_count', self.lang).format(len(self.current_files)))
+        self.schedule_live_preview()
     
     def get_selected_files(self) -> List[Path]:
         """获取选中的文件 - Get selected files"""
+        if self.file_listbox.all_selected:
+            return list(self.current_files)
         selected_indices = self.file_listbox.curselection()
         if not selected_indices:
             return self.current_files
@@ -600,131 +1056,144 @@ class BatchRenamerGUI:
             return
         
         try:
-            mode = self.rename_mode.get()
-            
-            if mode == "prefix":
-                rename_func = patterns.add_prefix
-                kwargs = {"prefix": self.prefix_entry.get()}
-                
-            elif mode == "suffix":
-                rename_func = patterns.add_suffix
-                kwargs = {"suffix": self.suffix_entry.get()}
-                
-            elif mode == "replace":
-                rename_func = patterns.replace_text
-                kwargs = {
-                    "old_text": self.replace_old.get(),
-                    "new_text": self.replace_new.get(),
-                    "use_regex": self.replace_regex.get(),
-                    "case_sensitive": self.replace_case.get()
-                }
-                
-            elif mode == "number":
-                self.preview_number_rename(files)
-                return
-                
-            elif mode == "case":
-                rename_func = patterns.change_case
-                kwargs = {"case_type": self.case_type.get()}
-                
-            elif mode == "datetime":
-                rename_func = patterns.date_time_name
-                kwargs = {
-                    "date_format": self.datetime_format.get(),
-                    "use_modified_time": self.datetime_modified.get(),
-                    "prefix": self.datetime_prefix.get(),
-                    "suffix": self.datetime_suffix.get(),
-                    "keep_original": self.datetime_keep.get()
-                }
-                
-            elif mode == "remove":
-                rename_func = patterns.remove_characters
-                kwargs = {
-                    "remove_spaces": self.remove_spaces.get(),
-                    "remove_special": self.remove_special.get(),
-                    "custom_chars": self.remove_custom.get()
-                }
-                
-            elif mode == "insert":
-                rename_func = patterns.insert_text
-                kwargs = {
-                    "text": self.insert_text.get(),
-                    "position": self.insert_position.get()
-                }
-            else:
-                messagebox.showerror(
-                    get_text('error', self.lang), 
-                    get_text('unknown_mode', self.lang)
-                )
-                return
-            
-            # 预览
-            self.preview_results = self.renamer.preview_rename(files, rename_func, **kwargs)
-            self.display_preview()
-            self.rename_button.config(state=tk.NORMAL)
-            self.update_status(get_text('status_preview_complete', self.lang).format(len(self.preview_results)))
-            
+            # 规则在主线程中编译，工作线程不访问 Tk 变量
+            rule = self.build_rule()
         except Exception as e:
             messagebox.showerror(
                 get_text('error', self.lang), 
                 get_text('preview_error', self.lang).format(str(e))
             )
-    
-    def preview_number_rename(self, files: List[Path]):
-        """序号重命名的特殊预览处理 - Preview number rename"""
-        try:
-            results = []
-            start = self.number_start.get()
-            digits = self.number_digits.get()
-            prefix = self.number_prefix.get()
-            keep = self.number_keep.get()
-            
-            for i, file_path in enumerate(files):
-                new_name = patterns.number_sequence(
-                    file_path, i, start, digits, prefix, keep
-                )
-                new_path = file_path.parent / new_name
-                new_path = self.renamer._resolve_conflict(new_path, file_path)
-                results.append((file_path, new_path))
-            
+            return
+        
+        total = len(files)
+        sort_by, reverse, per_directory = self.get_order_params()
+        
+        def work(post, cancel):
+            ordered = files
+            if sort_by is not None or per_directory:
+                ordered = self.renamer.sort_files(files, sort_by, reverse, per_directory)
+            results = RenamePlan()
+            for old_path, new_path in self.renamer.iter_preview(ordered, rule, per_directory=per_directory):
+                results.append(old_path, new_path)
+                if len(results) % PROGRESS_INTERVAL == 0:
+                    if cancel.is_set():
+                        return None
+                    post(("progress", len(results), total, 'status_previewing'))
+            return results
+        
+        def on_done(results):
+            if results is None:
+                self.update_status(get_text('status_cancelled', self.lang))
+                return
             self.preview_results = results
             self.display_preview()
             self.rename_button.config(state=tk.NORMAL)
-            self.update_status(get_text('status_preview_complete', self.lang).format(len(results)))
-            
-        except Exception as e:
+            self.update_status(get_text('status_preview_complete', self.lang).format(len(self.preview_results)))
+        
+        def on_error(e):
             messagebox.showerror(
                 get_text('error', self.lang), 
                 get_text('preview_error', self.lang).format(str(e))
             )
+        
+        self.start_task(work, on_done, on_error)
+    
+    def get_rule_params(self, mode: str) -> dict:
+        """读取当前模式的参数 - Collect parameters of the current mode"""
+        if mode == "prefix":
+            return {"prefix": self.prefix_entry.get()}
+        elif mode == "suffix":
+            return {"suffix": self.suffix_entry.get()}
+        elif mode == "replace":
+            return {
+                "old_text": self.replace_old.get(),
+                "new_text": self.replace_new.get(),
+                "use_regex": self.replace_regex.get(),
+                "case_sensitive": self.replace_case.get()
+            }
+        elif mode == "number":
+            return {
+                "start": self.number_start.get(),
+                "digits": self.number_digits.get(),
+                "prefix": self.number_prefix.get(),
+                "keep_original": self.number_keep.get()
+            }
+        elif mode == "case":
+            return {"case_type": self.case_type.get()}
+        elif mode == "datetime":
+            return {
+                "date_format": self.datetime_format.get(),
+                "use_modified_time": self.datetime_modified.get(),
+                "prefix": self.datetime_prefix.get(),
+                "suffix": self.datetime_suffix.get(),
+                "keep_original": self.datetime_keep.get()
+            }
+        elif mode == "remove":
+            return {
+                "remove_spaces": self.remove_spaces.get(),
+                "remove_special": self.remove_special.get(),
+                "custom_chars": self.remove_custom.get()
+            }
+        elif mode == "insert":
+            return {
+                "text": self.insert_text.get(),
+                "position": self.insert_position.get()
+            }
+        elif mode == "hash":
+            return {
+                "algorithm": self.hash_algorithm.get(),
+                "length": self.hash_length.get(),
+                "read_bytes": self.hash_read_kb.get() * 1024,
+                "prefix": self.hash_prefix.get(),
+                "keep_original": self.hash_keep.get()
+            }
+        elif mode == "mediadate":
+            return {
+                "date_format": self.mediadate_format.get(),
+                "prefix": self.mediadate_prefix.get(),
+                "suffix": self.mediadate_suffix.get(),
+                "keep_original": self.mediadate_keep.get(),
+                "fallback_to_mtime": self.mediadate_fallback.get()
+            }
+        elif mode == "template":
+            return {
+                "template": self.template_text.get(),
+                "start": self.template_start.get()
+            }
+        raise ValueError(get_text('unknown_mode', self.lang))
     
     def display_preview(self):
         """显示预览结果 - Display preview"""
-        self.preview_text.delete(1.0, tk.END)
-        
+        # 没有结果时显示一行提示
+        self.preview_text.clear()
+        self.preview_text.set_count(max(1, len(self.preview_results)))
+    
+    def render_file_rows(self, first: int, last: int):
+        """渲染文件列表的可见行 - Render visible file rows"""
+        return [
+            (str(file_path.relative_to(self.listed_directory)), None)
+            for file_path in self.current_files[first:last]
+        ]
+    
+    def render_preview_rows(self, first: int, last: int):
+        """按可见窗口渲染预览对比 - Render the visible window of the preview"""
         if not self.preview_results:
-            no_preview = "No preview results" if self.lang == 'en' else "没有预览结果"
-            self.preview_text.insert(tk.END, no_preview)
-            return
+            return [("No preview results" if self.lang == 'en' else "没有预览结果", None)]
         
-        # 显示对比
-        max_len = max(len(old.name) for old, _ in self.preview_results)
+        # 直接读取计划中的名称，不为可见行构造 Path
+        last = min(last, len(self.preview_results))
+        window = [self.preview_results.names(i) for i in range(first, last)]
+        max_len = max(len(old_name) for old_name, _ in window)
+        unchanged = "(no change)" if self.lang == 'en' else "(无变化)"
         
-        for old_path, new_path in self.preview_results:
-            old_name = old_path.name
-            new_name = new_path.name
-            
+        rows = []
+        for old_name, new_name in window:
             # 高亮显示变化
             if old_name != new_name:
-                line = f"{old_name:<{max_len}}  →  {new_name}\n"
-                self.preview_text.insert(tk.END, line)
+                rows.append((f"{old_name:<{max_len}}  →  {new_name}", None))
             else:
-                unchanged = "(no change)" if self.lang == 'en' else "(无变化)"
-                line = f"{old_name:<{max_len}}  {unchanged}\n"
-                self.preview_text.insert(tk.END, line, "unchanged")
-        
-        # 配置标签样式
-        self.preview_text.tag_config("unchanged", foreground="gray")
+                rows.append((f"{old_name:<{max_len}}  {unchanged}", "gray"))
+        return rows
     
     def execute_rename(self):
         """执行重命名 - Execute rename"""
@@ -744,8 +1213,17 @@ class BatchRenamerGUI:
         if not result:
             return
         
-        try:
-            success_count, errors = self.renamer.execute_rename(self.preview_results)
+        rename_list = self.preview_results
+        
+        def work(post, cancel):
+            return self.renamer.execute_rename(
+                rename_list,
+                progress=lambda done, total: post(("progress", done, total, 'status_renaming')),
+                cancel=cancel
+            )
+        
+        def on_done(outcome):
+            success_count, errors = outcome
             
             # 显示结果
             if errors:
@@ -763,20 +1241,26 @@ class BatchRenamerGUI:
                 )
             
             # 刷新列表
-            self.refresh_files()
-            self.preview_results = []
+            self.preview_results = RenamePlan()
             self.rename_button.config(state=tk.DISABLED)
-            self.preview_text.delete(1.0, tk.END)
+            self.preview_text.clear()
+            self.refresh_files()
             self.update_status(get_text('status_rename_complete', self.lang).format(success_count))
-            
-        except Exception as e:
+        
+        def on_error(e):
             messagebox.showerror(
                 get_text('error', self.lang), 
                 get_text('rename_error', self.lang).format(str(e))
             )
+        
+        self.start_task(work, on_done, on_error)
     
     def undo_operation(self):
         """撤销上次操作 - Undo operation"""
+        if self.task_thread is not None:
+            self.update_status(get_text('status_busy', self.lang))
+            return
+        
         success, message = self.renamer.undo_last_operation()
         
         if success:
@@ -789,6 +1273,47 @@ class BatchRenamerGUI:
                 message
             )
     
+    def check_pending_operation(self, startup: bool = False):
+        """处理上次中断的重命名 - Resume or roll back an interrupted rename"""
+        if self.task_thread is not None:
+            self.update_status(get_text('status_busy', self.lang))
+            return
+        
+        plan = self.renamer.wal.load()
+        if plan is None:
+            if not startup:
+                messagebox.showinfo(get_text('success', self.lang), get_text('no_pending', self.lang))
+            return
+        
+        choice = messagebox.askyesnocancel(
+            get_text('warning', self.lang),
+            get_text('pending_found', self.lang).format(plan.timestamp)
+        )
+        if choice is None:
+            return
+        
+        def work(post, cancel):
+            post(("progress", 0, None, 'status_recovering'))
+            if choice:
+                return 'pending_resumed', self.renamer.resume()
+            return 'pending_rolled_back', self.renamer.rollback()
+        
+        def on_done(outcome):
+            key, (count, errors) = outcome
+            message = get_text(key, self.lang).format(count)
+            if errors:
+                message += "\n" + "\n".join(errors[:10])
+                messagebox.showwarning(get_text('warning', self.lang), message)
+            else:
+                messagebox.showinfo(get_text('success', self.lang), message)
+            self.refresh_files()
+            self.update_status(message.split("\n")[0])
+        
+        def on_error(e):
+            messagebox.showerror(get_text('error', self.lang), str(e))
+        
+        self.start_task(work, on_done, on_error)
+    
     def clear_history(self):
         """清空历史记录 - Clear history"""
         result = messagebox.askyesno(
@@ -814,9 +1339,116 @@ class BatchRenamerGUI:
         text.insert(1.0, get_text('help_text', self.lang))
         text.config(state=tk.DISABLED)
     
+    def toggle_metrics(self):
+        """开启或关闭性能统计 - Toggle metrics collection"""
+        if self.task_thread is not None:
+            # 任务运行中切换会让工作线程看到一半的状态
+            self.metrics_var.set(self.renamer.metrics is not None)
+            self.update_status(get_text('status_busy', self.lang))
+            return
+        if self.metrics_var.get():
+            self.renamer.enable_metrics()
+        else:
+            self.renamer.disable_metrics()
+    
+    def export_metrics(self):
+        """把性能统计导出为 JSON - Export metrics as JSON"""
+        metrics = self.renamer.metrics
+        if metrics is None:
+            messagebox.showinfo(get_text('metrics', self.lang), get_text('metrics_disabled', self.lang))
+            return
+        
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            initialfile="renamer_metrics.json"
+        )
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(metrics.to_json())
+        except OSError as e:
+            messagebox.showerror(get_text('error', self.lang), str(e))
+            return
+        self.update_status(get_text('metrics_saved', self.lang).format(path))
+    
     def update_status(self, message: str):
         """更新状态栏 - Update status"""
         self.statusbar.config(text=message)
+    
+    def start_task(self, work, on_done, on_error, on_partial=None) -> bool:
+        """在后台线程中执行任务 - Run a task on a worker thread
+        
+        work(post, cancel) 在工作线程中运行，通过 post 发送消息；
+        回调都在主线程中通过 root.after 轮询队列调用。
+        """
+        if self.task_thread is not None:
+            self.update_status(get_text('status_busy', self.lang))
+            return False
+        
+        self.task_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.task_callbacks = (on_done, on_error, on_partial)
+        post = self.task_queue.put
+        cancel = self.cancel_event
+        
+        def run():
+            try:
+                post(("done", work(post, cancel)))
+            except Exception as e:
+                post(("error", e))
+        
+        self.task_thread = threading.Thread(target=run, daemon=True)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress_bar.config(mode='indeterminate', value=0)
+        self.progress_bar.start(10)
+        self.task_thread.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_task_queue)
+        return True
+    
+    def poll_task_queue(self):
+        """处理工作线程发来的消息 - Process messages from the worker"""
+        on_done, on_error, on_partial = self.task_callbacks
+        try:
+            for _ in range(MAX_MESSAGES_PER_POLL):
+                kind, *payload = self.task_queue.get_nowait()
+                if kind == "progress":
+                    self.show_progress(*payload)
+                elif kind == "partial":
+                    on_partial(*payload)
+                else:
+                    self.finish_task()
+                    if kind == "done":
+                        on_done(payload[0])
+                    else:
+                        on_error(payload[0])
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(POLL_INTERVAL_MS, self.poll_task_queue)
+    
+    def show_progress(self, done: int, total, status_key: str):
+        """更新进度条 - Update progress bar"""
+        if total:
+            if str(self.progress_bar.cget('mode')) != 'determinate':
+                self.progress_bar.stop()
+                self.progress_bar.config(mode='determinate')
+            self.progress_bar.config(maximum=total, value=done)
+        self.update_status(get_text(status_key, self.lang).format(done, total))
+    
+    def finish_task(self):
+        """任务结束后复位状态 - Reset task state"""
+        self.task_thread = None
+        self.progress_bar.stop()
+        self.progress_bar.config(mode='determinate', value=0)
+        self.cancel_button.config(state=tk.DISABLED)
+    
+    def cancel_task(self):
+        """取消当前任务 - Cancel the running task"""
+        if self.task_thread is not None:
+            self.cancel_event.set()
+            self.update_status(get_text('status_cancelling', self.lang))
 
 
 def main(lang='en'):
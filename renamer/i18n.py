@@ -27,6 +27,7 @@ TRANSLATIONS = {
         'file_list': 'File List',
         'file_type': 'File Type:',
         'include_subdirs': 'Include Subdirectories',
+        'watch_changes': 'Watch for changes',
         'original_files': 'Original Files',
         'preview_comparison': 'Preview Comparison',
         'file_count': 'Files: {}',
@@ -42,6 +43,9 @@ TRANSLATIONS = {
         'mode_datetime': 'Date/Time',
         'mode_remove': 'Remove Characters',
         'mode_insert': 'Insert Text',
+        'mode_hash': 'Content Hash',
+        'mode_mediadate': 'Capture Date (EXIF/ID3)',
+        'mode_template': 'Template',
         
         # Prefix options
         'prefix_settings': 'Prefix Settings',
@@ -63,6 +67,14 @@ TRANSLATIONS = {
         'start_number': 'Start Number:',
         'number_digits': 'Digits:',
         'keep_original': 'Keep Original Name',
+        'sort_by': 'Order:',
+        'sort_selection': 'As listed',
+        'sort_name': 'Name (natural)',
+        'sort_mtime': 'Modified time',
+        'sort_size': 'Size',
+        'sort_taken': 'Capture date',
+        'sort_reverse': 'Reverse order',
+        'per_directory': 'Restart numbering in each folder',
         
         # Case options
         'case_settings': 'Case Settings',
@@ -90,6 +102,21 @@ TRANSLATIONS = {
         'position_start': 'Start',
         'position_end': 'End',
         
+        # Hash options
+        'hash_settings': 'Content Hash Settings',
+        'hash_algorithm': 'Algorithm:',
+        'hash_length': 'Characters (0 = all):',
+        'hash_read_kb': 'Read first KB (0 = whole file):',
+        
+        # Capture date options
+        'mediadate_settings': 'Capture Date Settings',
+        'fallback_to_mtime': 'Use modified time when no embedded date',
+        
+        # Template options
+        'template_settings': 'Template Settings',
+        'template': 'Template:',
+        'template_hint': 'Fields: {name} {stem} {ext} {parent} {counter:03} {size} {date:%Y%m%d} {ctime} {taken} {hash:.8}\nFilters: {stem|lower} |upper |title |sentence |strip',
+        
         # Status messages
         'status_ready': 'Ready',
         'status_directory_selected': 'Directory selected: {}',
@@ -98,6 +125,17 @@ TRANSLATIONS = {
         'status_rename_complete': 'Rename complete: {} successful',
         'status_undo_complete': 'Undo complete',
         'status_history_cleared': 'History cleared',
+        'status_scanning': 'Scanning... {} files found',
+        'status_previewing': 'Previewing... {}/{}',
+        'status_renaming': 'Renaming... {}/{}',
+        'status_cancelling': 'Cancelling...',
+        'status_cancelled': 'Cancelled',
+        'status_busy': 'Another task is still running',
+        'metrics': 'Metrics',
+        'export_metrics': 'Export Metrics',
+        'metrics_disabled': 'Metrics are off. Tick "Metrics" before running a job.',
+        'metrics_saved': 'Metrics saved to {}',
+        'cancel': 'Cancel',
         
         # Dialog messages
         'warning': 'Warning',
@@ -119,6 +157,18 @@ TRANSLATIONS = {
         'preview_error': 'Preview failed: {}',
         'rename_error': 'Rename failed: {}',
         'unknown_mode': 'Unknown rename mode',
+        'chain_settings': 'Rule Chain',
+        'chain_add': 'Add Current Mode',
+        'chain_remove': 'Remove',
+        'chain_clear': 'Clear',
+        'chain_hint': 'When the chain has steps, preview applies all of them in order.',
+        'live_preview': 'Live preview while typing',
+        'pending_found': 'The previous rename ({}) was interrupted.\n\nYes: finish it\nNo: roll it back\nCancel: decide later',
+        'pending_resumed': 'Finished interrupted rename: {} files',
+        'pending_rolled_back': 'Rolled back interrupted rename: {} files',
+        'recover': 'Recover Interrupted Rename',
+        'no_pending': 'There is no interrupted rename to recover.',
+        'status_recovering': 'Recovering interrupted rename...',
         
         # Help text
         'help_title': 'Help',
@@ -173,6 +223,7 @@ Notes:
         'file_list': '文件列表',
         'file_type': '文件类型:',
         'include_subdirs': '包含子目录',
+        'watch_changes': '监视变化',
         'original_files': '原始文件',
         'preview_comparison': '预览对比',
         'file_count': '文件数: {}',
@@ -188,6 +239,9 @@ Notes:
         'mode_datetime': '日期时间',
         'mode_remove': '删除字符',
         'mode_insert': '插入文本',
+        'mode_hash': '内容摘要',
+        'mode_mediadate': '拍摄日期 (EXIF/ID3)',
+        'mode_template': '模板',
         
         # Prefix options
         'prefix_settings': '前缀设置',
@@ -209,6 +263,14 @@ Notes:
         'start_number': '起始数字:',
         'number_digits': '数字位数:',
         'keep_original': '保留原文件名',
+        'sort_by': '排序:',
+        'sort_selection': '列表顺序',
+        'sort_name': '名称（自然排序）',
+        'sort_mtime': '修改时间',
+        'sort_size': '大小',
+        'sort_taken': '拍摄日期',
+        'sort_reverse': '倒序',
+        'per_directory': '每个文件夹重新编号',
         
         # Case options
         'case_settings': '大小写设置',
@@ -236,6 +298,21 @@ Notes:
         'position_start': '开头',
         'position_end': '结尾',
         
+        # Hash options
+        'hash_settings': '内容摘要设置',
+        'hash_algorithm': '算法:',
+        'hash_length': '保留字符数 (0 为全部):',
+        'hash_read_kb': '只读取前 KB (0 为整个文件):',
+        
+        # Capture date options
+        'mediadate_settings': '拍摄日期设置',
+        'fallback_to_mtime': '没有内嵌日期时使用修改时间',
+        
+        # Template options
+        'template_settings': '模板设置',
+        'template': '模板:',
+        'template_hint': '字段: {name} {stem} {ext} {parent} {counter:03} {size} {date:%Y%m%d} {ctime} {taken} {hash:.8}\n过滤器: {stem|lower} |upper |title |sentence |strip',
+        
         # Status messages
         'status_ready': '就绪',
         'status_directory_selected': '已选择目录: {}',
@@ -244,6 +321,17 @@ Notes:
         'status_rename_complete': '重命名完成: 成功 {} 个',
         'status_undo_complete': '已撤销上次操作',
         'status_history_cleared': '历史记录已清空',
+        'status_scanning': '正在扫描... 已找到 {} 个文件',
+        'status_previewing': '正在预览... {}/{}',
+        'status_renaming': '正在重命名... {}/{}',
+        'status_cancelling': '正在取消...',
+        'status_cancelled': '已取消',
+        'status_busy': '仍有任务在运行',
+        'metrics': '性能统计',
+        'export_metrics': '导出统计',
+        'metrics_disabled': '性能统计未开启，请先勾选"性能统计"再执行操作。',
+        'metrics_saved': '统计结果已保存到 {}',
+        'cancel': '取消',
         
         # Dialog messages
         'warning': '警告',
@@ -265,6 +353,18 @@ Notes:
         'preview_error': '预览失败: {}',
         'rename_error': '重命名失败: {}',
         'unknown_mode': '未知的重命名模式',
+        'chain_settings': '规则链',
+        'chain_add': '添加当前模式',
+        'chain_remove': '删除',
+        'chain_clear': '清空',
+        'chain_hint': '规则链不为空时，预览会按顺序应用其中所有步骤。',
+        'live_preview': '输入时实时预览',
+        'pending_found': '上次的重命名（{}）被中断。\n\n是：继续完成\n否：回滚已完成的部分\n取消：稍后处理',
+        'pending_resumed': '已完成中断的重命名: {} 个文件',
+        'pending_rolled_back': '已回滚中断的重命名: {} 个文件',
+        'recover': '恢复中断的重命名',
+        'no_pending': '没有需要恢复的中断重命名。',
+        'status_recovering': '正在恢复中断的重命名...',
         
         # Help text
         'help_title': '帮助',
@@ -0,0 +1,226 @@
+import os
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+MAX_RECORDS = 50
+# 未加载的日志超过该大小时，在追加后顺便压缩一次
+COMPACT_BYTES = 64 * 1024 * 1024
+
+_POP_LINE = '{"pop":1}'
+
+
+def encode_record(record: dict) -> str:
+    """把历史记录编码成一行：目录只存一次，操作里只存文件名。"""
+    dirs = []
+    dir_index = {}
+
+    def index_of(directory: str) -> int:
+        if directory not in dir_index:
+            dir_index[directory] = len(dirs)
+            dirs.append(directory)
+        return dir_index[directory]
+
+    ops = []
+    for op in record["operations"]:
+        old_dir, old_name = os.path.split(op["old"])
+        new_dir, new_name = os.path.split(op["new"])
+        entry = [index_of(old_dir), old_name, new_name]
+        if new_dir != old_dir:
+            entry.append(index_of(new_dir))
+        ops.append(entry)
+
+    data = {"t": record["timestamp"], "d": dirs, "o": ops}
+    # 部分撤销后剩下的、还没有改回的文件
+    if record.get("partial"):
+        data["p"] = 1
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_record(line: str) -> dict:
+    data = json.loads(line)
+    dirs = data["d"]
+    operations = []
+    for entry in data["o"]:
+        old_dir = dirs[entry[0]]
+        new_dir = dirs[entry[3]] if len(entry) > 3 else old_dir
+        operations.append({
+            "old": os.path.join(old_dir, entry[1]),
+            "new": os.path.join(new_dir, entry[2])
+        })
+    record = {"timestamp": data["t"], "operations": operations}
+    if data.get("p"):
+        record["partial"] = True
+    return record
+
+
+def compose_undo(records: List[dict]) -> List[Tuple[str, str]]:
+    """把连续的几条历史记录合并成一个撤销计划，返回 [(当前路径, 原始路径)]。
+
+    同一个文件被改过多次时直接从当前名称改回最初的名称；改了又改回原名的文件不再出现。
+    records 按时间从旧到新排列，结果从最新的操作开始。
+    """
+    target_of: Dict[str, str] = {}
+    # 该记录执行后的名称 -> 这个文件现在的路径；没有出现的名称之后没有再改过
+    current_of: Dict[str, str] = {}
+    for record in reversed(records):
+        # 同一条记录中的操作是同时生效的（链式、互换），先按执行后的名称查出全部当前路径，
+        # 再换成执行前的名称，否则会把前后两个状态的名称混在一起
+        resolved = [
+            (op["old"], current_of.pop(op["new"], op["new"]))
+            for op in record["operations"]
+        ]
+        for old, current in resolved:
+            target_of[current] = old
+            current_of[old] = current
+    return [(current, original) for current, original in target_of.items() if current != original]
+
+
+class HistoryJournal:
+    """只追加的行式历史日志。
+
+    每次执行追加一行记录，撤销追加一行 pop 标记；文件只在需要读取历史时
+    才加载，且只解码被请求的记录。加载时会把日志压缩为最近的 MAX_RECORDS 条。
+    """
+
+    def __init__(self, path: Path, legacy_path: Optional[Path] = None):
+        self.path = Path(path)
+        self.legacy_path = legacy_path
+        self._lines: Optional[List[str]] = None
+
+    def _load(self) -> List[str]:
+        if self._lines is not None:
+            return self._lines
+
+        lines = []
+        total = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for raw in f:
+                    if not raw.endswith("\n"):
+                        # 追加到一半时进程退出留下的残行，压缩时丢弃
+                        total += 1
+                        break
+                    raw = raw.rstrip("\n")
+                    if not raw:
+                        continue
+                    total += 1
+                    if raw == _POP_LINE:
+                        if lines:
+                            lines.pop()
+                    else:
+                        lines.append(raw)
+        except FileNotFoundError:
+            lines = self._import_legacy()
+            # 导入的旧记录需要立即写入日志文件
+            total = -1 if lines else 0
+        except Exception:
+            lines = []
+            total = 0
+
+        # 旧版本在残行后直接追加，会得到无法解码的行
+        self._lines = [line for line in lines[-MAX_RECORDS:] if self._valid(line)]
+        if total != len(self._lines):
+            self.compact()
+        return self._lines
+
+    @staticmethod
+    def _valid(line: str) -> bool:
+        # 只检查是否为完整的 JSON 记录，不展开操作；真正解码时再跳过坏记录
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return False
+        return isinstance(data, dict) and "t" in data and "d" in data and "o" in data
+
+    @staticmethod
+    def _decode(line: str) -> Optional[dict]:
+        try:
+            return decode_record(line)
+        except (ValueError, KeyError, IndexError, TypeError):
+            return None
+
+    def _import_legacy(self) -> List[str]:
+        # 兼容旧版本的整文件 JSON 历史
+        if self.legacy_path is None or not self.legacy_path.exists():
+            return []
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                return [encode_record(r) for r in json.load(f)[-MAX_RECORDS:]]
+        except Exception:
+            return []
+
+    def _write_line(self, line: str):
+        try:
+            with open(self.path, 'a+b') as f:
+                # 上次写入被中断时文件不以换行结尾，新记录必须另起一行
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = "\n" + line
+                f.write((line + "\n").encode("utf-8"))
+        except Exception:
+            pass
+
+    def append(self, record: dict):
+        line = encode_record(record)
+        self._write_line(line)
+
+        if self._lines is not None:
+            self._lines.append(line)
+            if len(self._lines) > MAX_RECORDS:
+                del self._lines[:-MAX_RECORDS]
+                self.compact()
+        else:
+            try:
+                if self.path.stat().st_size > COMPACT_BYTES:
+                    self._load()
+            except OSError:
+                pass
+
+    def pop(self) -> Optional[dict]:
+        lines = self._load()
+        while lines:
+            line = lines.pop()
+            self._write_line(_POP_LINE)
+            record = self._decode(line)
+            if record is not None:
+                return record
+        return None
+
+    def last(self) -> Optional[dict]:
+        lines = self._load()
+        while lines:
+            record = self._decode(lines[-1])
+            if record is not None:
+                return record
+            # 无法解码的记录直接丢弃，下次压缩时从文件中移除
+            lines.pop()
+            self._write_line(_POP_LINE)
+        return None
+
+    def records(self, limit: Optional[int] = None) -> List[dict]:
+        lines = self._load()
+        if limit is not None:
+            lines = lines[-limit:] if limit > 0 else []
+        decoded = (self._decode(line) for line in lines)
+        return [record for record in decoded if record is not None]
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def compact(self):
+        lines = self._lines if self._lines is not None else []
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for line in lines:
+                    f.write(line + "\n")
+            os.replace(tmp_path, self.path)
+        except Exception:
+            pass
+
+    def clear(self):
+        self._lines = []
+        self.compact()
@@ -0,0 +1,252 @@
+import os
+import mmap
+import struct
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+
+PathLike = Union[str, Path]
+
+# 不用 mmap 时每次读取的大小
+READ_CHUNK = 1 << 20
+
+# EXIF 标签：Exif 子目录指针、拍摄时间、数字化时间、修改时间
+_EXIF_IFD = 0x8769
+_DATE_TAGS = (0x9003, 0x9004)
+_IFD0_DATE = 0x0132
+
+
+def file_digest(path: PathLike, algorithm: str = "sha1", limit: int = 0) -> str:
+    """计算文件内容的摘要；limit > 0 时只读取前 limit 个字节。
+
+    完整摘要通过 mmap 读取，大文件不需要在 Python 中分块复制。
+    """
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        if limit > 0:
+            digest.update(f.read(limit))
+            return digest.hexdigest()
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                digest.update(m)
+        except (ValueError, OSError, OverflowError):
+            # 空文件不能映射，某些文件系统也不支持 mmap
+            f.seek(0)
+            for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_exif_time(value: str) -> Optional[datetime]:
+    value = value.strip("\0 ")
+    try:
+        return datetime.strptime(value[:19], "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        # 相机没有设置时间时常见 "0000:00:00 00:00:00"
+        return None
+
+
+def _read_ifd(data, offset: int, order: str) -> Dict[int, Union[int, str]]:
+    # 只取需要的两类值：ASCII 字符串和单个 LONG（子目录指针）
+    tags = {}
+    try:
+        count = struct.unpack_from(order + "H", data, offset)[0]
+        for i in range(count):
+            entry = offset + 2 + i * 12
+            tag, kind, n, value = struct.unpack_from(order + "HHII", data, entry)
+            if kind == 2:
+                start = entry + 8 if n <= 4 else value
+                tags[tag] = bytes(data[start:start + n]).decode("ascii", "replace")
+            elif kind == 4 and n == 1:
+                tags[tag] = value
+    except struct.error:
+        pass
+    return tags
+
+
+def _tiff_date(data) -> Optional[datetime]:
+    if data[:4] == b"II*\0":
+        order = "<"
+    elif data[:4] == b"MM\0*":
+        order = ">"
+    else:
+        return None
+    try:
+        ifd0 = _read_ifd(data, struct.unpack_from(order + "I", data, 4)[0], order)
+    except struct.error:
+        return None
+    exif = {}
+    if isinstance(ifd0.get(_EXIF_IFD), int):
+        exif = _read_ifd(data, ifd0[_EXIF_IFD], order)
+    for tag, source in ((_DATE_TAGS[0], exif), (_DATE_TAGS[1], exif), (_IFD0_DATE, ifd0)):
+        value = source.get(tag)
+        if isinstance(value, str):
+            taken = _parse_exif_time(value)
+            if taken is not None:
+                return taken
+    return None
+
+
+def _jpeg_exif(f) -> Optional[bytes]:
+    # 依次跳过 JPEG 段，找到 APP1 中的 Exif 数据；图像数据开始前一定出现
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        while code == 0xFF:
+            fill = f.read(1)
+            if not fill:
+                return None
+            code = fill[0]
+        if code in (0xD9, 0xDA):
+            return None
+        if 0xD0 <= code <= 0xD7 or code == 0x01:
+            continue
+        header = f.read(2)
+        if len(header) < 2:
+            return None
+        length = struct.unpack(">H", header)[0] - 2
+        if length < 0:
+            return None
+        if code == 0xE1:
+            data = f.read(length)
+            if data.startswith(b"Exif\0\0"):
+                return data[6:]
+        else:
+            f.seek(length, 1)
+
+
+def _synchsafe(data: bytes) -> int:
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _id3_text(data: bytes) -> str:
+    if not data:
+        return ""
+    encoding = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}.get(data[0], "latin-1")
+    return data[1:].decode(encoding, "replace").split("\0")[0].strip()
+
+
+def _id3_frames(f) -> Dict[str, str]:
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b"ID3":
+        return {}
+    version, flags = header[3], header[5]
+    tag = f.read(_synchsafe(header[6:10]))
+    if flags & 0x80:
+        tag = tag.replace(b"\xff\x00", b"\xff")
+
+    pos = 0
+    if flags & 0x40 and version >= 3:
+        # 扩展头
+        size = _synchsafe(tag[:4]) if version == 4 else struct.unpack(">I", tag[:4])[0] + 4
+        pos = size
+
+    frames = {}
+    id_len, head_len = (3, 6) if version == 2 else (4, 10)
+    while pos + head_len <= len(tag):
+        frame_id = tag[pos:pos + id_len]
+        if not frame_id.strip(b"\0"):
+            break
+        if version == 2:
+            size = int.from_bytes(tag[pos + 3:pos + 6], "big")
+        elif version == 4:
+            size = _synchsafe(tag[pos + 4:pos + 8])
+        else:
+            size = struct.unpack(">I", tag[pos + 4:pos + 8])[0]
+        body = tag[pos + head_len:pos + head_len + size]
+        name = frame_id.decode("latin-1")
+        if name.startswith("T"):
+            frames[name] = _id3_text(body)
+        pos += head_len + size
+    return frames
+
+
+def _id3_date(frames: Dict[str, str]) -> Optional[datetime]:
+    # ID3v2.4 用 TDRC/TDOR（ISO 8601，可能只有年份）；v2.3/v2.2 把年、日月、时分分开存放
+    for name in ("TDRC", "TDOR"):
+        value = frames.get(name)
+        if value:
+            for fmt, size in (("%Y-%m-%dT%H:%M:%S", 19), ("%Y-%m-%dT%H:%M", 16), ("%Y-%m-%d", 10),
+                              ("%Y-%m", 7), ("%Y", 4)):
+                try:
+                    return datetime.strptime(value[:size], fmt)
+                except ValueError:
+                    continue
+
+    year = frames.get("TYER") or frames.get("TYE")
+    if not year or not year[:4].isdigit():
+        return None
+    text = year[:4]
+    fmt = "%Y"
+    day_month = frames.get("TDAT") or frames.get("TDA")
+    if day_month and len(day_month) >= 4 and day_month[:4].isdigit():
+        text += day_month[:4]
+        fmt += "%d%m"
+        hour_minute = frames.get("TIME") or frames.get("TIM")
+        if hour_minute and len(hour_minute) >= 4 and hour_minute[:4].isdigit():
+            text += hour_minute[:4]
+            fmt += "%H%M"
+    try:
+        return datetime.strptime(text, fmt)
+    except ValueError:
+        return None
+
+
+def _id3v1_date(f) -> Optional[datetime]:
+    try:
+        f.seek(-128, os.SEEK_END)
+    except OSError:
+        return None
+    tag = f.read(128)
+    year = tag[93:97]
+    if tag[:3] == b"TAG" and year.isdigit():
+        try:
+            return datetime(int(year), 1, 1)
+        except ValueError:
+            return None
+    return None
+
+
+def media_date(path: PathLike) -> Optional[datetime]:
+    """读取文件内嵌的拍摄或录制时间：JPEG/TIFF（及基于 TIFF 的 RAW）的 EXIF、MP3 的 ID3。
+
+    没有可识别的时间时返回 None。只读取文件头部需要的部分。
+    """
+    with open(path, "rb") as f:
+        try:
+            return _read_date(f)
+        except (struct.error, IndexError):
+            # 损坏或截断的元数据按没有时间处理
+            return None
+
+
+def _read_date(f) -> Optional[datetime]:
+    head = f.read(10)
+    if head[:2] == b"\xff\xd8":
+        f.seek(2)
+        data = _jpeg_exif(f)
+        return _tiff_date(data) if data else None
+
+    if head[:4] in (b"II*\0", b"MM\0*"):
+        # IFD 可能在文件任意位置，映射后由系统按需读取
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return _tiff_date(m)
+        except (ValueError, OSError):
+            return None
+
+    if head[:3] == b"ID3":
+        f.seek(0)
+        taken = _id3_date(_id3_frames(f))
+        if taken is not None:
+            return taken
+        return _id3v1_date(f)
+
+    # 没有 ID3v2 的 MP3 以帧同步开头，年份只能从结尾的 ID3v1 中取
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        return _id3v1_date(f)
+    return None
@@ -0,0 +1,120 @@
+import os
+import time
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from .metadata import StatCache, DEFAULT_WORKERS
+from .scancache import default_cache_path, RACY_SECONDS
+
+
+class MetadataCache:
+    """持久化的内容元数据缓存（内容摘要、内嵌的拍摄时间等）。
+
+    以 (设备, inode, 字段) 为键，同时记录文件大小和 mtime；两者都没变时直接使用缓存的值，
+    重复处理同一批文件时不必再读取文件内容。
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else default_cache_path("metadata.sqlite3")
+        self.enabled = True
+        # FileRenamer 开启统计时设置
+        self.metrics = None
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        # 每次查询单独连接，预览可能在不同的工作线程中进行
+        if not self.enabled:
+            return None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(os.fspath(self.path), timeout=5)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta ("
+                "dev INTEGER, ino INTEGER, field TEXT, size INTEGER, mtime REAL, value TEXT, "
+                "PRIMARY KEY (dev, ino, field))"
+            )
+        except (OSError, sqlite3.Error):
+            self.enabled = False
+            return None
+        return conn
+
+    def lookup(
+        self,
+        paths: Sequence[Path],
+        stats: StatCache,
+        field: str,
+        compute: Callable[[Path], Optional[str]],
+        workers: int = DEFAULT_WORKERS
+    ) -> List[Optional[str]]:
+        """返回每个文件的 field 值，缓存中没有或已过期的用 compute(path) 计算后写回。
+
+        compute 返回 None 表示文件没有该信息，这个结果同样会被缓存。
+        需要计算的文件在线程池中并行读取。
+        """
+        stats.prefetch(paths)
+        results: List[Optional[str]] = [None] * len(paths)
+        missing = []
+        keys = []
+        conn = self._connect()
+        try:
+            for i, path in enumerate(paths):
+                st = stats.peek(path)
+                keys.append(st)
+                if conn is None or st is None:
+                    missing.append(i)
+                    continue
+                try:
+                    row = conn.execute(
+                        "SELECT size, mtime, value FROM meta WHERE dev = ? AND ino = ? AND field = ?",
+                        (st.st_dev, st.st_ino, field)
+                    ).fetchone()
+                except sqlite3.Error:
+                    # 缓存文件损坏时本次及以后都直接读取文件
+                    conn.close()
+                    conn = None
+                    self.enabled = False
+                    missing.append(i)
+                    continue
+                if row is not None and row[0] == st.st_size and row[1] == st.st_mtime:
+                    results[i] = row[2] or None
+                else:
+                    missing.append(i)
+
+            if self.metrics is not None:
+                self.metrics.count("metadata_cache_hit", len(paths) - len(missing))
+                self.metrics.count("metadata_read", len(missing))
+
+            if workers > 1 and len(missing) > 1:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    values = list(pool.map(lambda i: compute(paths[i]), missing))
+            else:
+                values = [compute(paths[i]) for i in missing]
+
+            now = time.time()
+            rows = []
+            for i, value in zip(missing, values):
+                results[i] = value
+                st = keys[i]
+                # 刚修改过的文件可能在同一时间片内继续变化，不写入缓存
+                if st is not None and now - st.st_mtime >= RACY_SECONDS:
+                    rows.append((st.st_dev, st.st_ino, field, st.st_size, st.st_mtime, value or ""))
+            if conn is not None and rows:
+                try:
+                    conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?, ?, ?, ?, ?)", rows)
+                    conn.commit()
+                except sqlite3.Error:
+                    pass
+        finally:
+            if conn is not None:
+                conn.close()
+        return results
+
+    def get(self, path: Path, stats: StatCache, field: str, compute: Callable[[Path], Optional[str]]) -> Optional[str]:
+        return self.lookup([path], stats, field, compute, workers=1)[0]
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,108 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+
+# 少于该数量时直接串行 stat，线程池的开销不值得
+PARALLEL_THRESHOLD = 64
+DEFAULT_WORKERS = 8
+
+
+class FileStat(NamedTuple):
+    # 字段名与 os.stat_result 一致，规则可以不区分两者
+    st_mtime: float
+    st_ctime: float
+    st_size: int
+    st_ino: int
+    st_dev: int
+
+    @classmethod
+    def from_stat(cls, st: os.stat_result) -> "FileStat":
+        return cls(st.st_mtime, st.st_ctime, st.st_size, st.st_ino, st.st_dev)
+
+
+PathLike = Union[str, Path]
+
+
+class StatCache:
+    """扫描和预览共用的文件元数据缓存。
+
+    扫描时能免费拿到的 stat（Windows 上的 DirEntry.stat）直接记录下来；
+    其余的在需要时通过线程池并行预取。
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, FileStat] = {}
+        self._lock = threading.Lock()
+        # FileRenamer 开启统计时设置，用于记录实际的 stat 次数
+        self.metrics = None
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def put(self, path: PathLike, st: os.stat_result):
+        self._stats[os.fspath(path)] = FileStat.from_stat(st)
+
+    def get(self, path: PathLike) -> FileStat:
+        key = os.fspath(path)
+        cached = self._stats.get(key)
+        if cached is None:
+            if self.metrics is not None:
+                self.metrics.count("stat")
+            cached = FileStat.from_stat(os.stat(key))
+            self._stats[key] = cached
+        return cached
+
+    def peek(self, path: PathLike) -> Optional[FileStat]:
+        return self._stats.get(os.fspath(path))
+
+    def prefetch(self, paths: Iterable[PathLike], workers: int = DEFAULT_WORKERS):
+        missing = [os.fspath(p) for p in paths if os.fspath(p) not in self._stats]
+        if not missing:
+            return
+        if self.metrics is not None:
+            self.metrics.count("stat", len(missing))
+
+        def fetch(key):
+            try:
+                return key, os.stat(key)
+            except OSError:
+                return key, None
+
+        if workers <= 1 or len(missing) < PARALLEL_THRESHOLD:
+            results = map(fetch, missing)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(fetch, missing, chunksize=64))
+
+        with self._lock:
+            for key, st in results:
+                if st is not None:
+                    self._stats[key] = FileStat.from_stat(st)
+
+    def discard(self, path: PathLike):
+        self._stats.pop(os.fspath(path), None)
+
+    def clear(self):
+        self._stats.clear()
+
+
+def prefetched(
+    files: Iterable[Path],
+    cache: StatCache,
+    batch_size: int = 1024,
+    workers: int = DEFAULT_WORKERS
+) -> Iterator[Path]:
+    """按批预取元数据后再逐个产出文件，适用于流式预览。"""
+    batch: List[Path] = []
+    for file_path in files:
+        batch.append(file_path)
+        if len(batch) >= batch_size:
+            cache.prefetch(batch, workers)
+            yield from batch
+            batch = []
+    if batch:
+        cache.prefetch(batch, workers)
+        yield from batch
@@ -0,0 +1,92 @@
+import json
+import time
+import errno
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Iterator, TypeVar, Union
+
+
+T = TypeVar("T")
+
+
+class Metrics:
+    """可选的性能统计：系统调用次数、各阶段耗时和错误分类。
+
+    通过 FileRenamer.enable_metrics() 开启，未开启时各处都不做任何统计。
+    计数可能来自多个工作线程，所有修改都加锁。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = datetime.now().isoformat()
+            self.counters = Counter()
+            self.seconds = defaultdict(float)
+            self.calls = Counter()
+            self.errors = Counter()
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def add_time(self, phase: str, seconds: float, calls: int = 1):
+        with self._lock:
+            self.seconds[phase] += seconds
+            self.calls[phase] += calls
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed(self, phase: str, items: Iterable[T]) -> Iterator[T]:
+        # 只统计生成器自身的耗时，不包括调用方处理每一项的时间
+        it = iter(items)
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    elapsed += time.perf_counter() - start
+                    return
+                elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            self.add_time(phase, elapsed)
+
+    def error(self, exc: Union[BaseException, str]):
+        # 按异常类型和 errno 归类，例如 "PermissionError/EACCES"；也可以直接给出类别名
+        if isinstance(exc, str):
+            category = exc
+        else:
+            category = type(exc).__name__
+            code = getattr(exc, "errno", None)
+            if code in errno.errorcode:
+                category += "/" + errno.errorcode[code]
+        with self._lock:
+            self.errors[category] += 1
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "counters": dict(self.counters),
+                "phases": {
+                    phase: {"seconds": round(self.seconds[phase], 6), "calls": self.calls[phase]}
+                    for phase in self.seconds
+                },
+                "errors": dict(self.errors),
+            }
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.report(), indent=indent)
@@ -0,0 +1,85 @@
+import os
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from .rules import split_name
+
+
+# Windows 和 macOS 默认的 APFS/HFS+ 都不区分大小写，APFS 还不区分 Unicode 规范化形式；
+# os.path.normcase 在 macOS 上什么也不做。区分大小写的卷上这样做只会多加后缀，不会覆盖文件
+_FOLD_CASE = os.name == "nt" or sys.platform == "darwin"
+
+
+def name_key(name: str) -> str:
+    # 与文件系统的名称比较规则保持一致
+    if _FOLD_CASE:
+        return unicodedata.normalize("NFC", name).lower()
+    return name
+
+
+class NameIndex:
+    """按目录缓存已存在的文件名和本次预览已占用的目标名。
+
+    每个目录只列举一次，之后的冲突检查全部在内存中完成。
+    """
+
+    def __init__(self):
+        self._dirs: Dict[str, Set[str]] = {}
+        # 记录每个基础名下一次尝试的后缀编号，避免大量同名时反复从 _1 开始探测
+        self._counters: Dict[Tuple[str, str], int] = {}
+        # 统计：列举目录的次数和冲突时尝试的候选名数量
+        self.listings = 0
+        self.probes = 0
+
+    def _names(self, parent: Path) -> Set[str]:
+        key = os.fspath(parent)
+        names = self._dirs.get(key)
+        if names is None:
+            self.listings += 1
+            try:
+                names = {name_key(n) for n in os.listdir(key)}
+            except (FileNotFoundError, NotADirectoryError, PermissionError):
+                names = set()
+            self._dirs[key] = names
+        return names
+
+    def snapshot(self, parent: Path) -> Set[str]:
+        # 当前目录名称集合的副本，可以用 seed 装入新的索引，省去再次列举
+        return set(self._names(parent))
+
+    def seed(self, parent: Path, names: Set[str]):
+        self._dirs[os.fspath(parent)] = names
+
+    def release_name(self, parent: Path, name: str):
+        self._names(parent).discard(name_key(name))
+
+    def resolve(self, new_path: Path, original_path: Path) -> Path:
+        """返回不冲突的目标路径（必要时追加 _1、_2 后缀）并占用它。"""
+        parent = new_path.parent
+        own_name = original_path.name if parent == original_path.parent else None
+        name = self.resolve_name(parent, new_path.name, own_name)
+        return new_path if name == new_path.name else parent / name
+
+    def resolve_name(self, parent: Path, name: str, own_name: Optional[str] = None) -> str:
+        """与 resolve 相同，但只处理名称；own_name 是同一目录中文件自己的原名。"""
+        names = self._names(parent)
+        key = name_key(name)
+        if key not in names or (own_name is not None and key == name_key(own_name)):
+            names.add(key)
+            return name
+
+        stem, suffix = split_name(name)
+        counter_key = (os.fspath(parent), key)
+        counter = self._counters.get(counter_key, 1)
+        while True:
+            self.probes += 1
+            candidate = f"{stem}_{counter}{suffix}"
+            if name_key(candidate) not in names:
+                break
+            counter += 1
+
+        self._counters[counter_key] = counter + 1
+        names.add(name_key(candidate))
+        return candidate
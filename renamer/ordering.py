@@ -0,0 +1,103 @@
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .metadata import StatCache
+from .rules import MediaDateRule
+
+
+# name: 按名称自然排序（"img2" 在 "img10" 之前）；taken: EXIF/ID3 中的拍摄时间，没有时用修改时间
+SORT_KEYS = ("name", "mtime", "size", "taken")
+
+_DIGITS = re.compile(r"\d+")
+
+
+def _encode_number(match) -> str:
+    # "0" + 位数 + 去掉前导零的数字：位数少的数更小，位数相同时逐位比较就是按数值比较；
+    # 文本中的数字都被替换了，同一位置上出现的 "0" 一定是另一个数的开头
+    digits = str(int(match.group()))
+    return "0" + chr(0x20 + len(digits)) + digits
+
+
+def natural_key(text: str) -> str:
+    """自然排序键：数字段按数值比较，其余部分不区分大小写。
+
+    键是普通字符串，排序时的比较全部在 C 中完成，不必比较嵌套的元组。
+    """
+    return _DIGITS.sub(_encode_number, text.casefold())
+
+
+def _metadata_keys(
+    files: Sequence[Path],
+    sort_by: str,
+    stats: StatCache,
+    metadata=None
+) -> list:
+    if sort_by == "taken":
+        rule = MediaDateRule(fallback_to_mtime=True)
+        rule.bind_stats(stats)
+        if metadata is not None:
+            rule.bind_metadata(metadata)
+        return [taken.timestamp() for taken in rule._dates(files)]
+
+    stats.prefetch(files)
+    keys = []
+    for f in files:
+        st = stats.peek(f)
+        if st is None:
+            # 预取时已经不存在的文件排在最前面，预览时再报告
+            keys.append(-1)
+        else:
+            keys.append(st.st_mtime if sort_by == "mtime" else st.st_size)
+    return keys
+
+
+def sort_paths(
+    files: Sequence[Path],
+    sort_by: Optional[str] = "name",
+    reverse: bool = False,
+    per_directory: bool = False,
+    stats: Optional[StatCache] = None,
+    metadata=None
+) -> List[Path]:
+    """按 sort_by 排序文件，结果与文件系统返回的顺序无关。
+
+    每个文件的排序键只计算一次（先装饰、排序、再取回文件），比较时不再访问磁盘；
+    元数据通过 StatCache 批量预取，拍摄时间经 MetadataCache 缓存。
+    键相同的文件按完整路径升序排列，reverse 时也一样。per_directory 时同一目录的文件排在一起，
+    目录按路径的自然顺序排列，reverse 只作用于目录内的顺序。sort_by 为 None 时保持原顺序。
+    """
+    files = list(files)
+    if sort_by is not None and sort_by not in SORT_KEYS:
+        raise ValueError(f"未知的排序方式: {sort_by}")
+
+    if sort_by is not None:
+        paths = [os.fspath(f) for f in files]
+        if sort_by == "name":
+            keys = [natural_key(os.path.basename(path)) for path in paths]
+        else:
+            keys = _metadata_keys(files, sort_by, stats if stats is not None else StatCache(), metadata)
+        if reverse:
+            # reverse 只作用于键：先按路径排好，再稳定地按键倒序，键相同的仍按路径升序
+            order = [i for _, i in sorted(zip(paths, range(len(files))))]
+            order.sort(key=keys.__getitem__, reverse=True)
+        else:
+            # (键, 路径, 序号) 直接比较，不需要逐个调用 key 函数
+            decorated = sorted(zip(keys, paths, range(len(files))))
+            order = [i for _, _, i in decorated]
+    else:
+        order = list(range(len(files)))
+
+    if per_directory:
+        dir_keys: Dict[str, str] = {}
+        directories = []
+        for f in files:
+            directory = os.path.dirname(os.fspath(f))
+            if directory not in dir_keys:
+                dir_keys[directory] = natural_key(directory)
+            directories.append(dir_keys[directory])
+        # 稳定排序，目录内保持上一步的顺序
+        order.sort(key=directories.__getitem__)
+
+    return [files[i] for i in order]
@@ -0,0 +1,82 @@
+import os
+import pickle
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .rules import RenameRule, NameColumns
+
+
+# 每个任务发送给子进程的文件名数量
+CHUNK_SIZE = 8192
+# 每个进程最多排队的任务数，限制在途的文件名数量
+QUEUE_DEPTH = 2
+
+# 子进程中的规则，由 _init_worker 在进程启动时设置一次
+_rule: Optional[RenameRule] = None
+
+
+def _init_worker(rule: RenameRule):
+    global _rule
+    _rule = rule
+
+
+def _evaluate(names: List[str], start: int) -> List[str]:
+    # 子进程只拿到文件名，没有目录，所以不支持需要元数据的规则
+    files = [Path(name) for name in names]
+    return _rule.apply_batch(files, NameColumns(names), start)
+
+
+def supports_processes(rule: RenameRule) -> bool:
+    """规则能否在子进程中求值：不需要文件元数据和所在目录，并且可以序列化。"""
+    if rule.needs_stat or rule.needs_path:
+        return False
+    try:
+        pickle.dumps(rule)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return False
+    return True
+
+
+def iter_named_processes(
+    files: Iterable[Path],
+    rule: RenameRule,
+    processes: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[Tuple[Path, str]]:
+    """在进程池中计算新名称，按输入顺序产出 (文件, 新名称)。
+
+    只有文件名字符串在进程间传递；编译好的规则在每个进程启动时发送一次。
+    适合正则等 CPU 密集、受 GIL 限制的规则。
+    """
+    processes = processes or os.cpu_count() or 1
+    it = iter(files)
+    pending = deque()
+    offset = 0
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(rule,)) as pool:
+        def submit() -> bool:
+            nonlocal offset
+            batch = list(itertools.islice(it, chunk_size))
+            if not batch:
+                return False
+            pending.append((batch, pool.submit(_evaluate, [f.name for f in batch], offset)))
+            offset += len(batch)
+            return True
+
+        for _ in range(processes * QUEUE_DEPTH):
+            if not submit():
+                break
+
+        try:
+            while pending:
+                batch, future = pending.popleft()
+                names = future.result()
+                submit()
+                yield from zip(batch, names)
+        finally:
+            # 调用方提前停止时不再等待排队中的任务
+            for _, future in pending:
+                future.cancel()
@@ -2,6 +2,8 @@ import re
 from pathlib import Path
 from datetime import datetime
 
+from .media import file_digest, media_date
+
 
 def add_prefix(file_path: Path, prefix: str) -> str:
     return f"{prefix}{file_path.name}"
@@ -155,3 +157,49 @@ def truncate_name(
         new_stem = stem[-max_length:]
     
     return f"{new_stem}{ext}"
+
+
+def content_hash_name(
+    file_path: Path,
+    algorithm: str = "sha1",
+    length: int = 12,
+    read_bytes: int = 0,
+    prefix: str = "",
+    keep_original: bool = False
+) -> str:
+    # read_bytes > 0 时只对文件开头的部分求摘要，适合快速区分大文件
+    digest = file_digest(file_path, algorithm, read_bytes)
+    if length > 0:
+        digest = digest[:length]
+    ext = file_path.suffix
+
+    if keep_original:
+        stem = file_path.stem
+        return f"{prefix}{digest}_{stem}{ext}"
+    else:
+        return f"{prefix}{digest}{ext}"
+
+
+def media_date_name(
+    file_path: Path,
+    date_format: str = "%Y%m%d_%H%M%S",
+    prefix: str = "",
+    suffix: str = "",
+    keep_original: bool = False,
+    fallback_to_mtime: bool = True
+) -> str:
+    # 使用 EXIF / ID3 中的拍摄或录制时间；没有时按修改时间，或保留原名
+    taken = media_date(file_path)
+    if taken is None:
+        if not fallback_to_mtime:
+            return file_path.name
+        taken = datetime.fromtimestamp(file_path.stat().st_mtime)
+
+    date_str = taken.strftime(date_format)
+    ext = file_path.suffix
+
+    if keep_original:
+        stem = file_path.stem
+        return f"{prefix}{date_str}_{stem}{suffix}{ext}"
+    else:
+        return f"{prefix}{date_str}{suffix}{ext}"
@@ -0,0 +1,106 @@
+import os
+from array import array
+from pathlib import Path, PurePath
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+
+class RenamePlan:
+    """紧凑的重命名计划，可以像 [(旧路径, 新路径), ...] 一样使用。
+
+    父目录只保存一份，条目里只记录目录下标和文件名；名称未变的条目新旧共用一个字符串。
+    Path 对象只在按下标或迭代访问时才构造，百万级文件的预览结果也只占很少的内存。
+    """
+
+    __slots__ = ("_dirs", "_dir_ids", "_old_dirs", "_new_dirs", "_old_names", "_new_names")
+
+    def __init__(self, pairs: Iterable[Tuple[Path, Path]] = ()):
+        self._dirs: List[str] = []
+        self._dir_ids: Dict[str, int] = {}
+        self._old_dirs = array("I")
+        self._new_dirs = array("I")
+        self._old_names: List[str] = []
+        self._new_names: List[str] = []
+        self.extend(pairs)
+
+    def _intern(self, directory: str) -> int:
+        index = self._dir_ids.get(directory)
+        if index is None:
+            index = self._dir_ids[directory] = len(self._dirs)
+            self._dirs.append(directory)
+        return index
+
+    def append(self, old_path: Union[str, Path], new_path: Union[str, Path]):
+        # 字符串先规范化成与 Path 相同的形式，保证与执行结果中的路径一致
+        old = os.fspath(old_path if isinstance(old_path, PurePath) else Path(old_path))
+        new = os.fspath(new_path if isinstance(new_path, PurePath) else Path(new_path))
+        old_dir, old_name = os.path.split(old)
+        old_id = self._intern(old_dir)
+        if new == old:
+            new_id, new_name = old_id, old_name
+        else:
+            new_dir, new_name = os.path.split(new)
+            new_id = old_id if new_dir == old_dir else self._intern(new_dir)
+        self._old_dirs.append(old_id)
+        self._new_dirs.append(new_id)
+        self._old_names.append(old_name)
+        self._new_names.append(new_name)
+
+    def extend(self, pairs: Iterable[Tuple[Path, Path]]):
+        if isinstance(pairs, RenamePlan):
+            pairs = pairs.iter_strings()
+        for old_path, new_path in pairs:
+            self.append(old_path, new_path)
+
+    def __len__(self) -> int:
+        return len(self._old_names)
+
+    def _strings(self, i: int) -> Tuple[str, str]:
+        return (
+            os.path.join(self._dirs[self._old_dirs[i]], self._old_names[i]),
+            os.path.join(self._dirs[self._new_dirs[i]], self._new_names[i]),
+        )
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("重命名计划下标越界")
+        old, new = self._strings(i)
+        return Path(old), Path(new)
+
+    def __iter__(self) -> Iterator[Tuple[Path, Path]]:
+        for old, new in self.iter_strings():
+            yield Path(old), Path(new)
+
+    def iter_strings(self) -> Iterator[Tuple[str, str]]:
+        """以字符串形式迭代 (旧路径, 新路径)，不构造 Path。"""
+        for i in range(len(self)):
+            yield self._strings(i)
+
+    def iter_changed(self) -> Iterator[Tuple[Path, Path]]:
+        """只产出真正需要改名的条目。"""
+        for i in range(len(self)):
+            if self.is_changed(i):
+                old, new = self._strings(i)
+                yield Path(old), Path(new)
+
+    def names(self, i: int) -> Tuple[str, str]:
+        return self._old_names[i], self._new_names[i]
+
+    def is_changed(self, i: int) -> bool:
+        return self._new_dirs[i] != self._old_dirs[i] or self._new_names[i] != self._old_names[i]
+
+    def changed(self) -> "RenamePlan":
+        plan = RenamePlan()
+        plan.extend(self.iter_changed())
+        return plan
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (RenamePlan, list, tuple)):
+            return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RenamePlan({len(self)} files, {len(self._dirs)} directories)"
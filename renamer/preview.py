@@ -0,0 +1,113 @@
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .namespace import NameIndex
+from .rules import RenameRule, NameColumns
+from .metadata import StatCache
+
+
+# 最多保留多少条规则的求值结果（输入时来回修改参数可以直接命中）
+MAX_RULES = 8
+
+PlanChunk = Callable[[List[Tuple[Path, str]], NameIndex], Iterable[Tuple[Path, Path]]]
+
+
+class PreviewCache:
+    """增量预览缓存。
+
+    规则结果按 (文件, 规则) 缓存，只有新文件或新规则才重新求值；
+    冲突解决按目录进行，目录内的输入没有变化时直接复用上次的结果，
+    有变化时用缓存的目录列表重建名称索引，不再访问磁盘。
+    文件系统变化（重新扫描、执行重命名）后需要调用 invalidate。
+    """
+
+    def __init__(self, plan_chunk: PlanChunk, stats: StatCache, max_rules: int = MAX_RULES):
+        self.plan_chunk = plan_chunk
+        self.stats = stats
+        self.max_rules = max_rules
+        # 规则键 -> ({文件键: 新名称}, {目录: (输入, 规划结果)})
+        self._rules: "OrderedDict[tuple, Tuple[Dict[tuple, str], Dict[str, tuple]]]" = OrderedDict()
+        # 目录 -> 磁盘上已有的名称
+        self._listings: Dict[str, Set[str]] = {}
+
+    def _entry(self, rule: RenameRule) -> Tuple[Dict[tuple, str], Dict[str, tuple]]:
+        key = rule.key
+        entry = self._rules.get(key)
+        if entry is None:
+            entry = self._rules[key] = ({}, {})
+            while len(self._rules) > self.max_rules:
+                self._rules.popitem(last=False)
+        else:
+            self._rules.move_to_end(key)
+        return entry
+
+    def _file_key(self, file_path: Path, index: int, rule: RenameRule) -> tuple:
+        key = (os.fspath(file_path),)
+        if rule.uses_index:
+            key += (index,)
+        if rule.needs_stat:
+            st = self.stats.get(file_path)
+            key += (st.st_mtime, st.st_ctime)
+        return key
+
+    def evaluate(self, files: List[Path], rule: RenameRule) -> List[Tuple[Path, str]]:
+        names = self._entry(rule)[0]
+        if rule.needs_stat:
+            rule.bind_stats(self.stats)
+            self.stats.prefetch(files)
+
+        keys = [self._file_key(file_path, i, rule) for i, file_path in enumerate(files)]
+        missing = [i for i, key in enumerate(keys) if key not in names]
+        if missing:
+            if rule.uses_index:
+                for i in missing:
+                    names[keys[i]] = rule(files[i], i)
+            else:
+                # 与序号无关的规则：未命中的文件合成一批按列求值
+                batch = [files[i] for i in missing]
+                for i, new_name in zip(missing, rule.apply_batch(batch, NameColumns.from_paths(batch))):
+                    names[keys[i]] = new_name
+        return [(file_path, names[key]) for file_path, key in zip(files, keys)]
+
+    def preview(self, files: Iterable[Path], rule: RenameRule) -> List[Tuple[Path, Path]]:
+        files = list(files)
+        plans = self._entry(rule)[1]
+        by_dir: Dict[str, List[Tuple[Path, str]]] = {}
+        for file_path, new_name in self.evaluate(files, rule):
+            parent = os.path.dirname(os.fspath(file_path))
+            by_dir.setdefault(parent, []).append((file_path, new_name))
+
+        planned: Dict[str, Path] = {}
+        for parent, named in by_dir.items():
+            # 用字符串比较输入，比逐个比较 Path 快得多
+            signature = [(os.fspath(file_path), new_name) for file_path, new_name in named]
+            cached = plans.get(parent)
+            if cached is not None and cached[0] == signature:
+                plan = cached[1]
+            else:
+                plan = self._plan_directory(parent, named)
+                plans[parent] = (signature, plan)
+            planned.update((os.fspath(file_path), new_path) for file_path, new_path in plan)
+
+        return [(file_path, planned[os.fspath(file_path)]) for file_path in files]
+
+    def _plan_directory(self, parent: str, named: List[Tuple[Path, str]]) -> List[Tuple[Path, Path]]:
+        index = NameIndex()
+        listing = self._listings.get(parent)
+        if listing is None:
+            listing = self._listings[parent] = index.snapshot(Path(parent))
+        index.seed(Path(parent), set(listing))
+        return list(self.plan_chunk(named, index))
+
+    def invalidate(self, directory: Optional[Path] = None):
+        """丢弃缓存。只传目录时仅丢弃该目录的列表和规划结果。"""
+        if directory is not None:
+            key = os.fspath(directory)
+            self._listings.pop(key, None)
+            for names, plans in self._rules.values():
+                plans.pop(key, None)
+            return
+        self._rules.clear()
+        self._listings.clear()
@@ -0,0 +1,699 @@
+import re
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Type, Union
+
+from . import patterns
+from .media import file_digest, media_date
+from .template import compile_template, FILTERS, STAT_FIELDS, CONTENT_FIELDS
+
+
+# 文件名中不可能出现的字符，用作批量字符串操作的分隔符
+_JOIN = "\0"
+
+
+def split_name(name: str):
+    # 与 pathlib 的 stem / suffix 规则一致
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[:i], name[i:]
+    return name, ""
+
+
+class NameColumns:
+    """一批文件名按列保存：完整名称、主干和扩展名，各只拆分一次。"""
+
+    __slots__ = ("names", "_stems", "_suffixes")
+
+    def __init__(self, names: List[str]):
+        self.names = names
+        self._stems = None
+        self._suffixes = None
+
+    def _split(self):
+        # 只在规则用到主干或扩展名时才拆分
+        parts = [split_name(name) for name in self.names]
+        self._stems = [stem for stem, _ in parts]
+        self._suffixes = [suffix for _, suffix in parts]
+
+    @property
+    def stems(self) -> List[str]:
+        if self._stems is None:
+            self._split()
+        return self._stems
+
+    @property
+    def suffixes(self) -> List[str]:
+        if self._suffixes is None:
+            self._split()
+        return self._suffixes
+
+    @classmethod
+    def from_paths(cls, files: Sequence[Path]) -> "NameColumns":
+        return cls([f.name for f in files])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def _renamed(path: Path, name: str) -> Path:
+    # 规则链的中间名称：不用 with_name，名称中可能有路径分隔符；
+    # 空名称和 "."、".." 与规划时一样保留原名
+    if name == path.name or name in ("", ".", ".."):
+        return path
+    return path.parent / name
+
+
+def _map_joined(func: Callable[[str], str], values: List[str]) -> List[str]:
+    # 逐字符的转换（大小写、删除字符）可以在拼接后的整串上一次完成
+    return func(_JOIN.join(values)).split(_JOIN) if values else []
+
+
+class RenameRule:
+    """预编译的重命名规则。
+
+    参数在构造时校验一次，正则和转换表也只构建一次，之后可以应用到任意数量的文件。
+    rule(file_path, index) 返回新文件名，index 是文件在本次列表中的序号。
+    在规则链中 file_path 是上一步得到的名称，source 是磁盘上的原始文件。
+    """
+
+    mode = ""
+    # 需要文件元数据的规则在预览前会绑定 StatCache 并批量预取
+    needs_stat = False
+    # 结果依赖文件序号的规则（编号），增量预览的缓存键要带上序号
+    uses_index = False
+    # 需要读取文件内容的规则（摘要、内嵌时间），结果通过 MetadataCache 持久化
+    needs_metadata = False
+    # 需要文件所在目录的规则，不能在只有文件名的子进程中求值
+    needs_path = False
+    stats = None
+    metadata = None
+
+    def bind_stats(self, stats):
+        self.stats = stats
+
+    def bind_metadata(self, metadata):
+        self.metadata = metadata
+
+    def __getstate__(self):
+        # 发送到子进程时不带元数据缓存（含锁，也不应跨进程共享）
+        state = self.__dict__.copy()
+        state.pop("stats", None)
+        state.pop("metadata", None)
+        return state
+
+    @property
+    def key(self) -> tuple:
+        # 规则的身份：类型加全部公开参数，参数相同的两条规则得到相同的结果
+        params = tuple(sorted(
+            (name, value) for name, value in vars(self).items()
+            if not name.startswith("_") and name not in ("stats", "metadata")
+        ))
+        return (type(self).__name__, params)
+
+    def __call__(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        return self.apply(file_path, index, source)
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        raise NotImplementedError
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        """对一批文件求新名称，结果与逐个调用 apply 相同。
+
+        files 是磁盘上的原始文件，columns 是当前名称（规则链中为上一步的结果），
+        start 是第一个文件的序号。子类可以按列整体计算来覆盖它。
+        """
+        return [
+            self.apply(_renamed(f, name), start + i, f)
+            for i, (f, name) in enumerate(zip(files, columns.names))
+        ]
+
+
+class PrefixRule(RenameRule):
+    mode = "prefix"
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        return self.prefix + file_path.name
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        prefix = self.prefix
+        return [prefix + name for name in columns.names]
+
+
+class SuffixRule(RenameRule):
+    mode = "suffix"
+
+    def __init__(self, suffix: str):
+        self.suffix = suffix
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        return file_path.stem + self.suffix + file_path.suffix
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        suffix = self.suffix
+        return [stem + suffix + ext for stem, ext in zip(columns.stems, columns.suffixes)]
+
+
+class ReplaceRule(RenameRule):
+    mode = "replace"
+
+    def __init__(
+        self,
+        old_text: str,
+        new_text: str,
+        use_regex: bool = False,
+        case_sensitive: bool = True
+    ):
+        self.old_text = old_text
+        self.new_text = new_text
+        self.use_regex = use_regex
+        self.case_sensitive = case_sensitive
+        self._regex = None
+
+        if use_regex:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            try:
+                self._regex = re.compile(old_text, flags)
+            except re.error as e:
+                raise ValueError(f"正则表达式无效: {e}")
+        elif not case_sensitive:
+            self._regex = re.compile(re.escape(old_text), re.IGNORECASE)
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        if self._regex is not None:
+            return self._regex.sub(self.new_text, file_path.name)
+        return file_path.name.replace(self.old_text, self.new_text)
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        new_text = self.new_text
+        if self._regex is not None:
+            sub = self._regex.sub
+            return [sub(new_text, name) for name in columns.names]
+        old_text = self.old_text
+        return [name.replace(old_text, new_text) for name in columns.names]
+
+
+class NumberRule(RenameRule):
+    mode = "number"
+    uses_index = True
+
+    def __init__(
+        self,
+        start: int = 1,
+        digits: int = 3,
+        prefix: str = "",
+        keep_original: bool = False
+    ):
+        if digits < 1:
+            raise ValueError(f"位数必须大于 0: {digits}")
+        self.start = start
+        self.digits = digits
+        self.prefix = prefix
+        self.keep_original = keep_original
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        number_str = str(self.start + index).zfill(self.digits)
+        if self.keep_original:
+            return f"{self.prefix}{number_str}_{file_path.stem}{file_path.suffix}"
+        return f"{self.prefix}{number_str}{file_path.suffix}"
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        first = self.start + start
+        numbers = [str(n).zfill(self.digits) for n in range(first, first + len(columns))]
+        prefix = self.prefix
+        if self.keep_original:
+            return [
+                f"{prefix}{number}_{stem}{ext}"
+                for number, stem, ext in zip(numbers, columns.stems, columns.suffixes)
+            ]
+        return [prefix + number + ext for number, ext in zip(numbers, columns.suffixes)]
+
+
+class CaseRule(RenameRule):
+    mode = "case"
+
+    _CONVERTERS = {
+        "lower": str.lower,
+        "upper": str.upper,
+        "title": str.title,
+        "sentence": str.capitalize,
+    }
+
+    def __init__(self, case_type: str = "lower"):
+        if case_type not in self._CONVERTERS:
+            raise ValueError(f"未知的大小写类型: {case_type}")
+        self.case_type = case_type
+        self._convert = self._CONVERTERS[case_type]
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        # 扩展名统一小写
+        return self._convert(file_path.stem) + file_path.suffix.lower()
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        # capitalize 只作用于整串开头，不能拼接后一次转换
+        if self.case_type == "sentence":
+            stems = [stem.capitalize() for stem in columns.stems]
+        else:
+            stems = _map_joined(self._convert, columns.stems)
+        suffixes = _map_joined(str.lower, columns.suffixes)
+        return [stem + ext for stem, ext in zip(stems, suffixes)]
+
+
+class DateTimeRule(RenameRule):
+    mode = "datetime"
+    needs_stat = True
+
+    def __init__(
+        self,
+        date_format: str = "%Y%m%d_%H%M%S",
+        use_modified_time: bool = True,
+        prefix: str = "",
+        suffix: str = "",
+        keep_original: bool = False
+    ):
+        self.date_format = date_format
+        self.use_modified_time = use_modified_time
+        self.prefix = prefix
+        self.suffix = suffix
+        self.keep_original = keep_original
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        # 时间戳总是取自原始文件
+        source = source or file_path
+        st = self.stats.get(source) if self.stats is not None else source.stat()
+        timestamp = st.st_mtime if self.use_modified_time else st.st_ctime
+        date_str = datetime.fromtimestamp(timestamp).strftime(self.date_format)
+
+        if self.keep_original:
+            return f"{self.prefix}{date_str}_{file_path.stem}{self.suffix}{file_path.suffix}"
+        return f"{self.prefix}{date_str}{self.suffix}{file_path.suffix}"
+
+
+class HashRule(RenameRule):
+    """按文件内容的摘要命名。
+
+    摘要保存在绑定的 MetadataCache 中，文件未变化时再次预览不需要重新读取内容。
+    """
+
+    mode = "hash"
+    needs_stat = True
+    needs_metadata = True
+
+    def __init__(
+        self,
+        algorithm: str = "sha1",
+        length: int = 12,
+        read_bytes: int = 0,
+        prefix: str = "",
+        keep_original: bool = False
+    ):
+        # shake 系列的摘要长度可变，不适合作为名称
+        if algorithm not in hashlib.algorithms_available or algorithm.startswith("shake"):
+            raise ValueError(f"不支持的摘要算法: {algorithm}")
+        self.algorithm = algorithm
+        self.length = length
+        self.read_bytes = read_bytes
+        self.prefix = prefix
+        self.keep_original = keep_original
+        self._field = f"{algorithm}:{read_bytes}"
+
+    def _compute(self, source: Path) -> str:
+        return file_digest(source, self.algorithm, self.read_bytes)
+
+    def _digests(self, sources: Sequence[Path]) -> List[str]:
+        if self.metadata is not None and self.stats is not None:
+            digests = self.metadata.lookup(sources, self.stats, self._field, self._compute)
+        else:
+            digests = [self._compute(source) for source in sources]
+        return [digest[:self.length] if self.length > 0 else digest for digest in digests]
+
+    def _format(self, digest: str, stem: str, ext: str) -> str:
+        if self.keep_original:
+            return f"{self.prefix}{digest}_{stem}{ext}"
+        return f"{self.prefix}{digest}{ext}"
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        digest = self._digests([source or file_path])[0]
+        return self._format(digest, file_path.stem, file_path.suffix)
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        digests = self._digests(files)
+        return [
+            self._format(digest, stem, ext)
+            for digest, stem, ext in zip(digests, columns.stems, columns.suffixes)
+        ]
+
+
+class MediaDateRule(RenameRule):
+    """按 EXIF / ID3 中的拍摄或录制时间命名，没有时按修改时间或保留原名。"""
+
+    mode = "mediadate"
+    needs_stat = True
+    needs_metadata = True
+
+    _FIELD = "media_date"
+
+    def __init__(
+        self,
+        date_format: str = "%Y%m%d_%H%M%S",
+        prefix: str = "",
+        suffix: str = "",
+        keep_original: bool = False,
+        fallback_to_mtime: bool = True
+    ):
+        self.date_format = date_format
+        self.prefix = prefix
+        self.suffix = suffix
+        self.keep_original = keep_original
+        self.fallback_to_mtime = fallback_to_mtime
+
+    @staticmethod
+    def _compute(source: Path) -> Optional[str]:
+        taken = media_date(source)
+        return taken.isoformat() if taken is not None else None
+
+    def _dates(self, sources: Sequence[Path]) -> List[Optional[datetime]]:
+        if self.metadata is not None and self.stats is not None:
+            values = self.metadata.lookup(sources, self.stats, self._FIELD, self._compute)
+        else:
+            values = [self._compute(source) for source in sources]
+
+        dates = []
+        for source, value in zip(sources, values):
+            if value:
+                dates.append(datetime.fromisoformat(value))
+            elif self.fallback_to_mtime:
+                st = self.stats.get(source) if self.stats is not None else source.stat()
+                dates.append(datetime.fromtimestamp(st.st_mtime))
+            else:
+                dates.append(None)
+        return dates
+
+    def _format(self, taken: Optional[datetime], name: str, stem: str, ext: str) -> str:
+        if taken is None:
+            return name
+        date_str = taken.strftime(self.date_format)
+        if self.keep_original:
+            return f"{self.prefix}{date_str}_{stem}{self.suffix}{ext}"
+        return f"{self.prefix}{date_str}{self.suffix}{ext}"
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        taken = self._dates([source or file_path])[0]
+        return self._format(taken, file_path.name, file_path.stem, file_path.suffix)
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        dates = self._dates(files)
+        return [
+            self._format(taken, name, stem, ext)
+            for taken, name, stem, ext in zip(dates, columns.names, columns.stems, columns.suffixes)
+        ]
+
+
+class TemplateRule(RenameRule):
+    """按模板命名，例如 "{date:%Y%m%d}_{counter:04}_{stem|lower}{ext}"。
+
+    模板在构造时编译一次；每批文件按列求出用到的字段，没有用到的元数据不会读取，
+    例如模板中没有日期、大小等字段时不做任何 stat。counter 从 start 开始。
+    """
+
+    mode = "template"
+
+    def __init__(self, template: str, start: int = 1):
+        self.template = template
+        self.start = start
+        self._compiled = compile_template(template)
+        names = self._compiled.names
+        self.uses_index = "counter" in names
+        self.needs_stat = bool(names & STAT_FIELDS)
+        self.needs_metadata = bool(names & CONTENT_FIELDS)
+        self.needs_path = "parent" in names
+        # 拍摄日期和摘要复用对应规则的批量读取与缓存
+        self._media = MediaDateRule() if "taken" in names else None
+        self._hash = HashRule(length=0) if "hash" in names else None
+
+    def bind_stats(self, stats):
+        self.stats = stats
+        for helper in (self._media, self._hash):
+            if helper is not None:
+                helper.bind_stats(stats)
+
+    def bind_metadata(self, metadata):
+        self.metadata = metadata
+        for helper in (self._media, self._hash):
+            if helper is not None:
+                helper.bind_metadata(metadata)
+
+    def _stat(self, source: Path):
+        return self.stats.get(source) if self.stats is not None else source.stat()
+
+    def _column(self, name: str, files: Sequence[Path], columns: NameColumns, start: int) -> list:
+        if name == "name":
+            return columns.names
+        if name == "stem":
+            return columns.stems
+        if name == "ext":
+            return columns.suffixes
+        if name == "parent":
+            return [f.parent.name for f in files]
+        if name == "counter":
+            first = self.start + start
+            return list(range(first, first + len(files)))
+        if name == "size":
+            return [self._stat(f).st_size for f in files]
+        if name == "date":
+            return [datetime.fromtimestamp(self._stat(f).st_mtime) for f in files]
+        if name == "ctime":
+            return [datetime.fromtimestamp(self._stat(f).st_ctime) for f in files]
+        if name == "taken":
+            return self._media._dates(files)
+        return self._hash._digests(files)
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        source = source or file_path
+        return self.apply_batch([source], NameColumns([file_path.name]), index)[0]
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        compiled = self._compiled
+        raw = {}
+        values = []
+        for field in compiled.fields:
+            if field.name not in raw:
+                raw[field.name] = self._column(field.name, files, columns, start)
+            column = raw[field.name]
+            if field.filters:
+                # 先按格式说明转成字符串，再依次应用过滤器
+                column = [format(value, field.spec) for value in column]
+                for name in field.filters:
+                    column = list(map(FILTERS[name], column))
+            values.append(column)
+        if not values:
+            return [compiled.format_string.format()] * len(files)
+        render = compiled.format_string.format
+        return [render(*row) for row in zip(*values)]
+
+
+class RemoveRule(RenameRule):
+    mode = "remove"
+
+    _SPECIAL = re.compile(r'[^\w\u4e00-\u9fff\-]')
+
+    def __init__(
+        self,
+        remove_spaces: bool = False,
+        remove_special: bool = False,
+        custom_chars: str = ""
+    ):
+        self.remove_spaces = remove_spaces
+        self.remove_special = remove_special
+        self.custom_chars = custom_chars
+        # 空格和自定义字符合并成一张删除表，一次 translate 完成
+        chars = (" " if remove_spaces else "") + custom_chars
+        self._table = str.maketrans("", "", chars) if chars else None
+        self._special = self._SPECIAL if remove_special else None
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        stem = file_path.stem
+        if self._table is not None:
+            stem = stem.translate(self._table)
+        if self._special is not None:
+            stem = self._special.sub("", stem)
+        return stem + file_path.suffix
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        stems = columns.stems
+        if self._table is not None and _JOIN not in self.custom_chars:
+            stems = _map_joined(lambda joined: joined.translate(self._table), stems)
+        elif self._table is not None:
+            stems = [stem.translate(self._table) for stem in stems]
+        if self._special is not None:
+            # 分隔符本身也会被这个正则删除，只能逐个处理
+            sub = self._special.sub
+            stems = [sub("", stem) for stem in stems]
+        return [stem + ext for stem, ext in zip(stems, columns.suffixes)]
+
+
+class InsertRule(RenameRule):
+    mode = "insert"
+
+    def __init__(self, text: str, position: int = 0):
+        self.text = text
+        self.position = position
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        stem = file_path.stem
+        position = self.position
+        if position == -1 or position >= len(stem):
+            return f"{stem}{self.text}{file_path.suffix}"
+        return f"{stem[:position]}{self.text}{stem[position:]}{file_path.suffix}"
+
+
+class TruncateRule(RenameRule):
+    mode = "truncate"
+
+    def __init__(self, max_length: int = 50, from_start: bool = True):
+        if max_length < 1:
+            raise ValueError(f"长度必须大于 0: {max_length}")
+        self.max_length = max_length
+        self.from_start = from_start
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        stem = file_path.stem
+        if len(stem) <= self.max_length:
+            return file_path.name
+        new_stem = stem[:self.max_length] if self.from_start else stem[-self.max_length:]
+        return new_stem + file_path.suffix
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        n = self.max_length
+        if self.from_start:
+            return [
+                name if len(stem) <= n else stem[:n] + ext
+                for name, stem, ext in zip(columns.names, columns.stems, columns.suffixes)
+            ]
+        return [
+            name if len(stem) <= n else stem[-n:] + ext
+            for name, stem, ext in zip(columns.names, columns.stems, columns.suffixes)
+        ]
+
+
+class FunctionRule(RenameRule):
+    """把 patterns 中的普通函数包装成规则。
+
+    在规则链中函数拿到的是上一步的名称；date_time_name 会对该名称 stat，
+    链中需要时间戳时请使用 DateTimeRule。
+    """
+
+    def __init__(self, func: Callable, **kwargs):
+        self.func = func
+        self.kwargs = kwargs
+        self.mode = getattr(func, "__name__", "")
+
+    @property
+    def key(self) -> tuple:
+        try:
+            params = tuple(sorted(self.kwargs.items()))
+            hash(params)
+        except TypeError:
+            # 参数不可哈希时只认同一个对象
+            params = id(self)
+        return (self.func, params)
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        return self.func(file_path, **self.kwargs)
+
+
+class ChainRule(RenameRule):
+    """依次应用多条规则，整个链在内存中对文件名求值，最终只需一次重命名。"""
+
+    mode = "chain"
+
+    def __init__(self, steps: Sequence[Union[RenameRule, dict]]):
+        self.steps = [
+            step if isinstance(step, RenameRule) else compile_rule(**step)
+            for step in steps
+        ]
+        if not self.steps:
+            raise ValueError("规则链不能为空")
+        self.needs_stat = any(step.needs_stat for step in self.steps)
+        self.uses_index = any(step.uses_index for step in self.steps)
+        self.needs_metadata = any(step.needs_metadata for step in self.steps)
+        self.needs_path = any(step.needs_path for step in self.steps)
+
+    @property
+    def key(self) -> tuple:
+        return (self.mode, tuple(step.key for step in self.steps))
+
+    def bind_stats(self, stats):
+        self.stats = stats
+        for step in self.steps:
+            step.bind_stats(stats)
+
+    def bind_metadata(self, metadata):
+        self.metadata = metadata
+        for step in self.steps:
+            step.bind_metadata(metadata)
+
+    def apply(self, file_path: Path, index: int = 0, source: Optional[Path] = None) -> str:
+        source = source or file_path
+        current = file_path
+        for step in self.steps[:-1]:
+            current = _renamed(current, step.apply(current, index, source))
+        return self.steps[-1].apply(current, index, source)
+
+    def apply_batch(self, files: Sequence[Path], columns: NameColumns, start: int = 0) -> List[str]:
+        names = columns.names
+        for step in self.steps:
+            names = step.apply_batch(files, columns, start)
+            columns = NameColumns(names)
+        return names
+
+
+RULES: Dict[str, Type[RenameRule]] = {
+    rule.mode: rule
+    for rule in (
+        PrefixRule, SuffixRule, ReplaceRule, NumberRule, CaseRule,
+        DateTimeRule, RemoveRule, InsertRule, TruncateRule, HashRule,
+        MediaDateRule, TemplateRule, ChainRule,
+    )
+}
+
+
+# patterns 中的函数与等价的规则，参数名一致（number_sequence 需要序号，不在此列）
+FUNCTION_RULES: Dict[Callable, Type[RenameRule]] = {
+    patterns.add_prefix: PrefixRule,
+    patterns.add_suffix: SuffixRule,
+    patterns.replace_text: ReplaceRule,
+    patterns.change_case: CaseRule,
+    patterns.date_time_name: DateTimeRule,
+    patterns.remove_characters: RemoveRule,
+    patterns.insert_text: InsertRule,
+    patterns.truncate_name: TruncateRule,
+    patterns.content_hash_name: HashRule,
+    patterns.media_date_name: MediaDateRule,
+}
+
+
+def rule_for_function(func: Callable, **kwargs) -> Optional[RenameRule]:
+    """返回与 patterns 函数等价的规则；没有对应规则或参数不被规则接受时返回 None。"""
+    rule_class = FUNCTION_RULES.get(func)
+    if rule_class is None:
+        return None
+    try:
+        return rule_class(**kwargs)
+    except (TypeError, ValueError):
+        # 例如未知的大小写类型：函数保留原名，规则会报错，此时仍按函数处理
+        return None
+
+
+def compile_rule(mode: str, **kwargs) -> RenameRule:
+    # 规则链: compile_rule("chain", steps=[{"mode": "prefix", "prefix": "a_"}, ...])
+    if mode not in RULES:
+        raise ValueError(f"未知的重命名模式: {mode}")
+    try:
+        return RULES[mode](**kwargs)
+    except TypeError as e:
+        raise ValueError(f"参数错误 ({mode}): {e}")
@@ -0,0 +1,175 @@
+import os
+import sys
+import time
+import sqlite3
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+
+# 目录 mtime 距记录时间不足该值时不信任缓存（同一时间片内的后续修改不会改变 mtime）
+RACY_SECONDS = 2.0
+
+_SEP = "\0"
+
+
+def default_cache_path(name: str = "scan.sqlite3") -> Path:
+    """用户缓存目录下的缓存文件，默认是扫描缓存。"""
+    if os.name == "nt":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "batch_renamer" / name
+
+
+class DirListing(NamedTuple):
+    files: List[str]
+    subdirs: List[str]
+
+
+class CachedEntry(NamedTuple):
+    """缓存命中的目录没有 DirEntry，prune 回调收到的是这个替代品。
+
+    提供 DirEntry 的常用方法；缓存中的条目一定是子目录，其余信息在调用时才读取。
+    """
+
+    name: str
+    path: str
+
+    def is_dir(self, *, follow_symlinks: bool = True) -> bool:
+        return True
+
+    def is_file(self, *, follow_symlinks: bool = True) -> bool:
+        return False
+
+    def is_symlink(self) -> bool:
+        return os.path.islink(self.path)
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        return os.stat(self.path, follow_symlinks=follow_symlinks)
+
+    def inode(self) -> int:
+        return os.lstat(self.path).st_ino
+
+    def __fspath__(self) -> str:
+        return self.path
+
+
+class ScanCache:
+    """持久化的目录列表缓存，以目录的 mtime 和 inode 判断是否仍然有效。
+
+    只保存名称和类型，与匹配模式无关；mtime 未变的目录直接复用列表，不再列举。
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.enabled = True
+
+    def open(self) -> Optional["ScanSession"]:
+        # 每次扫描单独连接，扫描可能在不同的工作线程中进行
+        if not self.enabled:
+            return None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(os.fspath(self.path), timeout=5)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dirs ("
+                "path TEXT PRIMARY KEY, mtime_ns INTEGER, ino INTEGER, dev INTEGER, "
+                "files TEXT, subdirs TEXT)"
+            )
+        except (OSError, sqlite3.Error):
+            # 缓存不可用时退回普通扫描
+            self.enabled = False
+            return None
+        return ScanSession(conn)
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ScanSession:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.failed = False
+
+    def get(self, path: str, st: os.stat_result) -> Optional[DirListing]:
+        if self.failed:
+            return None
+        try:
+            row = self.conn.execute(
+                "SELECT mtime_ns, ino, dev, files, subdirs FROM dirs WHERE path = ?", (path,)
+            ).fetchone()
+        except sqlite3.Error:
+            self.failed = True
+            return None
+        if row is None or row[:3] != (st.st_mtime_ns, st.st_ino, st.st_dev):
+            return None
+        return DirListing(_split(row[3]), _split(row[4]))
+
+    def put(self, path: str, st: os.stat_result, listing: DirListing):
+        if self.failed:
+            return
+        # mtime 离现在太近的目录可能还会在同一时间片内变化，记为无效，下次重新列举
+        mtime_ns = st.st_mtime_ns
+        if time.time() - st.st_mtime < RACY_SECONDS:
+            mtime_ns = -1
+        try:
+            old = self.subdirs(path)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?)",
+                (path, mtime_ns, st.st_ino, st.st_dev,
+                 _SEP.join(listing.files), _SEP.join(listing.subdirs))
+            )
+            # 已经消失的子目录连同其下的记录一起删除
+            if old:
+                for name in set(old) - set(listing.subdirs):
+                    self.forget(os.path.join(path, name))
+        except sqlite3.Error:
+            self.failed = True
+
+    def subdirs(self, path: str) -> Optional[List[str]]:
+        row = self.conn.execute("SELECT subdirs FROM dirs WHERE path = ?", (path,)).fetchone()
+        return _split(row[0]) if row is not None else None
+
+    def forget(self, path: str):
+        prefix = path.rstrip(os.sep) + os.sep
+        # 用区间代替 LIKE，路径中的 % 和 _ 不需要转义
+        self.conn.execute(
+            "DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+            (path, prefix, prefix[:-1] + chr(ord(os.sep) + 1))
+        )
+
+    def close(self):
+        try:
+            if not self.failed:
+                self.conn.commit()
+        except sqlite3.Error:
+            pass
+        finally:
+            self.conn.close()
+
+
+def _split(value: str) -> List[str]:
+    return value.split(_SEP) if value else []
+
+
+def list_directory(path: str, follow_symlinks: bool = False) -> Tuple[DirListing, List[os.DirEntry]]:
+    """列举目录，分出文件和子目录；同时返回子目录的 DirEntry 供 prune 使用。"""
+    files = []
+    subdirs = []
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_file():
+                    files.append(entry.name)
+                elif entry.is_dir(follow_symlinks=follow_symlinks):
+                    subdirs.append(entry.name)
+                    entries.append(entry)
+            except OSError:
+                continue
+    return DirListing(files, subdirs), entries
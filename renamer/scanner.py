@@ -0,0 +1,161 @@
+import os
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Union
+
+from .filters import FileFilter, as_filter
+from .metadata import StatCache
+from .scancache import ScanCache, CachedEntry, list_directory
+from .metrics import Metrics
+
+
+DEFAULT_BATCH_SIZE = 512
+
+
+def iter_file_batches(
+    directory: str,
+    pattern: Union[str, FileFilter] = "*",
+    recursive: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    prune: Optional[Callable[[Union[os.DirEntry, CachedEntry]], bool]] = None,
+    follow_symlinks: bool = False,
+    stats: Optional[StatCache] = None,
+    cache: Optional[ScanCache] = None,
+    metrics: Optional[Metrics] = None
+) -> Iterator[List[Path]]:
+    """按批次流式产出文件，基于 os.scandir 并复用 DirEntry 的类型缓存。
+
+    pattern 可以是 FileFilter 或它的字符串写法，过滤在遍历中完成，
+    被过滤条件或 prune(entry) 排除的子目录不会被进入；目录列表来自缓存时 entry 是
+    CachedEntry，提供 name、path、is_dir、is_symlink、stat 等与 DirEntry 相同的接口。传入 stats 时，
+    遍历中得到的 stat（Windows 上免费，按大小或时间过滤时本来就要做）会记录到缓存里。
+    传入 cache 时使用持久化的目录列表缓存，见 _iter_cached_batches。
+    传入 metrics 时统计打开的目录数。
+    """
+    session = cache.open() if cache is not None else None
+    if session is not None:
+        try:
+            yield from _iter_cached_batches(
+                session, directory, pattern, recursive, batch_size, prune, follow_symlinks, stats, metrics
+            )
+        finally:
+            session.close()
+        return
+
+    spec = as_filter(pattern)
+    match = spec.match_name
+    check_stat = spec.needs_stat
+    record_stats = stats is not None and (os.name == "nt" or check_stat)
+    batch = []
+    stack = [os.fspath(directory)]
+
+    while stack:
+        current = stack.pop()
+        if metrics is not None:
+            metrics.count("scandir")
+        try:
+            it = os.scandir(current)
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            continue
+
+        subdirs = []
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        if match(entry.name):
+                            if record_stats or check_stat:
+                                st = entry.stat()
+                                if check_stat and metrics is not None and os.name != "nt":
+                                    metrics.count("stat")
+                                if record_stats:
+                                    stats.put(entry.path, st)
+                                if check_stat and not spec.match_stat(st):
+                                    continue
+                            batch.append(Path(entry.path))
+                            if len(batch) >= batch_size:
+                                yield batch
+                                batch = []
+                    elif recursive and entry.is_dir(follow_symlinks=follow_symlinks):
+                        if not spec.prunes(entry.name) and (prune is None or not prune(entry)):
+                            subdirs.append(entry.path)
+                except OSError:
+                    continue
+
+        # 逆序入栈，保持目录的遍历顺序
+        stack.extend(reversed(subdirs))
+
+    if batch:
+        yield batch
+
+
+def _iter_cached_batches(
+    session, directory, pattern, recursive, batch_size, prune, follow_symlinks, stats=None, metrics=None
+):
+    # 每个目录仍需一次 stat 判断是否变化，但 mtime 和 inode 未变的目录不再列举
+    spec = as_filter(pattern)
+    match = spec.match_name
+    check_stat = spec.needs_stat
+    batch = []
+    stack = [os.fspath(directory)]
+
+    while stack:
+        current = stack.pop()
+        try:
+            st = os.stat(current)
+        except OSError:
+            continue
+
+        listing = session.get(current, st)
+        # 与 DirEntry.path 的拼接方式一致，目录前缀只计算一次
+        base = os.path.join(current, "")
+        if metrics is not None:
+            metrics.count("stat")
+            metrics.count("scan_cache_hit" if listing is not None else "scandir")
+        if listing is None:
+            try:
+                listing, entries = list_directory(current, follow_symlinks)
+            except (PermissionError, FileNotFoundError, NotADirectoryError):
+                continue
+            session.put(current, st, listing)
+        else:
+            entries = [CachedEntry(name, base + name) for name in listing.subdirs]
+
+        for name in listing.files:
+            if match(name):
+                path = base + name
+                if check_stat:
+                    # 缓存只保存名称，按大小或时间过滤时仍要 stat 匹配的文件
+                    if metrics is not None:
+                        metrics.count("stat")
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    if stats is not None:
+                        stats.put(path, st)
+                    if not spec.match_stat(st):
+                        continue
+                batch.append(Path(path))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+
+        if recursive:
+            subdirs = [
+                entry.path for entry in entries
+                if not spec.prunes(entry.name) and (prune is None or not prune(entry))
+            ]
+            stack.extend(reversed(subdirs))
+
+    if batch:
+        yield batch
+
+
+def iter_files(
+    directory: str,
+    pattern: Union[str, FileFilter] = "*",
+    recursive: bool = False,
+    **kwargs
+) -> Iterator[Path]:
+    for batch in iter_file_batches(directory, pattern, recursive, **kwargs):
+        yield from batch
@@ -0,0 +1,200 @@
+import os
+import uuid
+import errno
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .namespace import name_key
+
+
+class RenameStep(NamedTuple):
+    source: Path
+    target: Path
+    origin: Path      # 被移动文件的原始路径
+    final: bool       # 该步骤完成后文件是否到达最终名称
+
+
+def _key(path: Path) -> str:
+    return os.path.join(os.fspath(path.parent), name_key(path.name))
+
+
+def temp_name(path: Path) -> Path:
+    return path.parent / f".{path.name}.{uuid.uuid4().hex[:12]}.renaming"
+
+
+def safe_rename(source: Path, target: Path):
+    """重命名，但不覆盖已存在的文件（POSIX 上 os.rename 会直接替换目标）。
+
+    只改大小写时，不区分大小写的文件系统上目标就是源文件本身，允许执行。
+    """
+    try:
+        existing = os.lstat(target)
+    except FileNotFoundError:
+        pass
+    else:
+        st = os.lstat(source)
+        if (existing.st_dev, existing.st_ino) != (st.st_dev, st.st_ino):
+            raise FileExistsError(errno.EEXIST, "目标文件已存在", os.fspath(target))
+    os.rename(source, target)
+
+
+def schedule_renames(
+    rename_list: List[Tuple[Path, Path]]
+) -> Tuple[List[List[RenameStep]], List[Tuple[Path, Path]]]:
+    """把重命名列表排成可以直接执行的步骤组。
+
+    链式重命名（a→b, b→c）按从尾到头的顺序执行；环（a→b, b→a）先把其中
+    一个文件移到临时名称再依次完成。每个组内的步骤必须按顺序执行，
+    不同组之间互不依赖。源或目标重复的条目不会被调度，作为第二个返回值返回。
+    """
+    by_source: Dict[str, Tuple[Path, Path]] = {}
+    targets = set()
+    order = []
+    duplicates = []
+    for old_path, new_path in rename_list:
+        if os.fspath(old_path) == os.fspath(new_path):
+            continue
+        key = _key(old_path)
+        target = _key(new_path)
+        if key in by_source or target in targets:
+            duplicates.append((old_path, new_path))
+            continue
+        by_source[key] = (old_path, new_path)
+        targets.add(target)
+        order.append(key)
+
+    # prev_of[k]：目标为 k 的那个重命名，只有 k 腾空后才能执行
+    prev_of: Dict[str, str] = {}
+    blocked = set()
+    for key in order:
+        target = _key(by_source[key][1])
+        if target != key and target in by_source:
+            prev_of[target] = key
+            blocked.add(key)
+
+    groups = []
+    visited = set()
+
+    # 目标位置空闲的重命名是链尾，从这里沿着依赖往回走
+    for key in order:
+        if key in blocked:
+            continue
+        group = []
+        current = key
+        while current is not None and current not in visited:
+            visited.add(current)
+            old_path, new_path = by_source[current]
+            group.append(RenameStep(old_path, new_path, old_path, True))
+            current = prev_of.get(current)
+        groups.append(group)
+
+    # 剩下的都在环里
+    for key in order:
+        if key in visited:
+            continue
+        first_old, first_new = by_source[key]
+        tmp = temp_name(first_old)
+        group = [RenameStep(first_old, tmp, first_old, False)]
+        visited.add(key)
+        current = prev_of.get(key)
+        while current is not None and current not in visited:
+            visited.add(current)
+            old_path, new_path = by_source[current]
+            group.append(RenameStep(old_path, new_path, old_path, True))
+            current = prev_of.get(current)
+        group.append(RenameStep(tmp, first_new, first_old, True))
+        groups.append(group)
+
+    return groups, duplicates
+
+
+def run_group(
+    group: List[RenameStep],
+    on_step: Optional[Callable[[int], None]] = None
+) -> Tuple[List[RenameStep], List[Tuple[RenameStep, Exception]]]:
+    """按顺序执行一个步骤组，返回 (完成的最终步骤, 失败信息)。
+
+    组内某一步失败时停止后续步骤；如果文件还停留在临时名称上，
+    则回滚该组已完成的步骤，避免留下临时文件。被跳过或回滚的步骤同样作为失败返回，
+    每个计划中的文件要么完成、要么出现在失败信息中。
+    on_step(i) 在第 i 步完成后调用，组被中止时以 -1 调用。
+    """
+    done = []
+    for i, step in enumerate(group):
+        try:
+            safe_rename(step.source, step.target)
+            done.append(step)
+        except OSError as e:
+            failures = [(step, e)]
+            rolled_back = False
+            if any(not s.final for s in done):
+                for completed in reversed(done):
+                    try:
+                        safe_rename(completed.target, completed.source)
+                    except OSError as rollback_error:
+                        failures.append((completed, rollback_error))
+                done = []
+                rolled_back = True
+
+            reported = {os.fspath(s.origin) for s, _ in failures}
+            finished = {os.fspath(s.origin) for s in done if s.final}
+            for j, other in enumerate(group):
+                origin = os.fspath(other.origin)
+                if other.final and origin not in reported and origin not in finished:
+                    reason = "已回滚" if rolled_back and j < i else "未执行"
+                    failures.append((other, RuntimeError(f"{reason}：所依赖的 {step.source.name} 重命名失败")))
+                    reported.add(origin)
+
+            if on_step is not None:
+                on_step(-1)
+            return [s for s in done if s.final], failures
+        if on_step is not None:
+            on_step(i)
+    return [s for s in done if s.final], []
+
+
+def shard_by_directory(groups: List[List[RenameStep]]) -> List[List[int]]:
+    # 同一目录的步骤组放在同一个分片里，按原顺序执行；返回每个分片的组下标
+    shards: Dict[str, List[int]] = {}
+    for i, group in enumerate(groups):
+        shards.setdefault(os.fspath(group[0].source.parent), []).append(i)
+    return list(shards.values())
+
+
+def run_groups(
+    groups: List[List[RenameStep]],
+    workers: int = 1,
+    on_step: Optional[Callable[[int, int], None]] = None,
+    cancel: Optional[threading.Event] = None
+) -> Tuple[List[RenameStep], List[Tuple[RenameStep, Exception]]]:
+    """执行多个步骤组；workers > 1 时按目录分片并在线程池中并行执行。
+
+    on_step(组下标, 步骤下标) 会在工作线程中被调用。cancel 被设置后
+    不再开始新的组，已开始的组会完整执行，不会把文件留在临时名称上。
+    """
+    def run_shard(indices):
+        shard_done, shard_failures = [], []
+        for gi in indices:
+            if cancel is not None and cancel.is_set():
+                break
+            callback = None if on_step is None else (lambda si, gi=gi: on_step(gi, si))
+            done, failures = run_group(groups[gi], callback)
+            shard_done.extend(done)
+            shard_failures.extend(failures)
+        return shard_done, shard_failures
+
+    if workers <= 1:
+        return run_shard(range(len(groups)))
+
+    shards = shard_by_directory(groups)
+    if len(shards) <= 1:
+        return run_shard(range(len(groups)))
+
+    done, failures = [], []
+    with ThreadPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+        for shard_done, shard_failures in pool.map(run_shard, shards):
+            done.extend(shard_done)
+            failures.extend(shard_failures)
+    return done, failures
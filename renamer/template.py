@@ -0,0 +1,92 @@
+import string
+from datetime import datetime
+from typing import List, NamedTuple, Tuple
+
+
+# 字段 -> 用于校验格式说明的示例值
+FIELDS = {
+    "name": "name.txt",
+    "stem": "name",
+    "ext": ".txt",
+    "parent": "dir",
+    "counter": 1,
+    "size": 1024,
+    "date": datetime(2024, 1, 1),
+    "ctime": datetime(2024, 1, 1),
+    "taken": datetime(2024, 1, 1),
+    "hash": "0" * 40,
+}
+
+# 需要 stat 的字段；taken 和 hash 还要读取文件内容
+STAT_FIELDS = {"size", "date", "ctime", "taken", "hash"}
+CONTENT_FIELDS = {"taken", "hash"}
+
+FILTERS = {
+    "lower": str.lower,
+    "upper": str.upper,
+    "title": str.title,
+    "sentence": str.capitalize,
+    "strip": str.strip,
+}
+
+
+class TemplateField(NamedTuple):
+    name: str
+    spec: str
+    filters: Tuple[str, ...]
+
+
+class CompiledTemplate(NamedTuple):
+    # 字段替换为 {0}、{1:spec} ... 的 str.format 模板，逐个文件只需一次 format
+    format_string: str
+    fields: List[TemplateField]
+
+    @property
+    def names(self) -> set:
+        return {field.name for field in self.fields}
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def compile_template(template: str) -> CompiledTemplate:
+    """解析 "{date:%Y%m%d}_{counter:04}_{stem|lower}{ext}" 这样的模板。
+
+    字段后的格式说明与 str.format 相同（日期用 strftime 格式，{hash:.8} 截取前 8 位），
+    "|" 之后是过滤器。"{{" 和 "}}" 表示花括号本身。
+    """
+    parts = []
+    fields = []
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"模板格式错误: {e}")
+
+    for literal, field_name, spec, conversion in parsed:
+        parts.append(_escape(literal))
+        if field_name is None:
+            continue
+        if conversion is not None or "{" in (spec or ""):
+            raise ValueError(f"模板格式错误: {{{field_name}}}")
+
+        # 过滤器可以写在字段名后（{stem|lower}），也可以写在格式说明后（{date:%b|lower}）
+        name, *filters = [part.strip() for part in field_name.split("|")]
+        spec, *more = (spec or "").split("|")
+        filters += [part.strip() for part in more]
+        if name not in FIELDS:
+            raise ValueError(f"未知的模板字段: {name}")
+        for f in filters:
+            if f not in FILTERS:
+                raise ValueError(f"未知的模板过滤器: {f}")
+        try:
+            format(FIELDS[name], spec)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"模板格式错误 {{{field_name}}}: {e}")
+
+        index = len(fields)
+        fields.append(TemplateField(name, spec, tuple(filters)))
+        # 带过滤器的字段在求值时已经格式化成字符串
+        parts.append(f"{{{index}:{spec}}}" if spec and not filters else f"{{{index}}}")
+
+    return CompiledTemplate("".join(parts), fields)
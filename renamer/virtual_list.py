@@ -0,0 +1,167 @@
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+from typing import Callable, List, Optional, Tuple
+
+
+# render(first, last) 返回 [(文本, 前景色或 None), ...]
+RowRenderer = Callable[[int, int], List[Tuple[str, Optional[str]]]]
+
+
+class VirtualListView(ttk.Frame):
+    """虚拟列表视图 - List view that renders only the visible rows
+
+    数据保存在外部模型中，控件只持有当前可见的几十行；滚动时按窗口重新渲染。
+    选择状态以模型下标保存，全选不会为每一行分配内存。
+    """
+
+    def __init__(self, parent, render: RowRenderer, selectable: bool = True, font=('Courier', 9)):
+        super().__init__(parent)
+        self.render = render
+        self.selectable = selectable
+        self.count = 0
+        self.top = 0
+        self.rows = 1
+
+        self.all_selected = False
+        self.selected = set()
+        self.anchor = 0
+
+        self.listbox = tk.Listbox(
+            self,
+            font=font,
+            activestyle='none',
+            selectmode=tk.MULTIPLE,
+            exportselection=False
+        )
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.scrollbar = ttk.Scrollbar(self, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        border = int(self.listbox.cget('selectborderwidth'))
+        self.line_height = tkfont.Font(font=font).metrics('linespace') + 2 * border
+
+        self.listbox.bind('<Configure>', self.on_resize)
+        self.listbox.bind('<MouseWheel>', self.on_mousewheel)
+        self.listbox.bind('<Button-4>', lambda e: self.scroll_by(-3))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll_by(3))
+        self.listbox.bind('<Button-1>', self.on_click)
+        self.listbox.bind('<Shift-Button-1>', self.on_shift_click)
+        self.listbox.bind('<Control-Button-1>', self.on_control_click)
+        self.listbox.bind('<B1-Motion>', lambda e: "break")
+        self.listbox.bind('<Control-a>', self.on_select_all)
+
+    # 模型
+    def set_count(self, count: int):
+        self.count = count
+        if self.top > max(0, count - self.rows):
+            self.top = max(0, count - self.rows)
+        self.redraw()
+
+    def clear(self):
+        self.selected = set()
+        self.all_selected = False
+        self.top = 0
+        self.set_count(0)
+
+    # 选择
+    def select_all(self):
+        if self.selectable:
+            self.all_selected = True
+            self.selected = set()
+            self.redraw()
+
+    def on_select_all(self, event):
+        self.select_all()
+        return "break"
+
+    def curselection(self) -> List[int]:
+        if self.all_selected:
+            return list(range(self.count))
+        return sorted(i for i in self.selected if i < self.count)
+
+    def is_selected(self, index: int) -> bool:
+        return self.all_selected or index in self.selected
+
+    def _index_at(self, event) -> Optional[int]:
+        index = self.top + self.listbox.nearest(event.y)
+        return index if 0 <= index < self.count else None
+
+    def on_click(self, event):
+        index = self._index_at(event)
+        if self.selectable and index is not None:
+            self.all_selected = False
+            self.selected = {index}
+            self.anchor = index
+            self.redraw()
+        self.listbox.focus_set()
+        return "break"
+
+    def on_shift_click(self, event):
+        index = self._index_at(event)
+        if self.selectable and index is not None:
+            low, high = sorted((self.anchor, index))
+            self.all_selected = False
+            self.selected = set(range(low, high + 1))
+            self.redraw()
+        return "break"
+
+    def on_control_click(self, event):
+        index = self._index_at(event)
+        if self.selectable and index is not None:
+            if self.all_selected:
+                self.all_selected = False
+                self.selected = set(range(self.count))
+            self.selected ^= {index}
+            self.anchor = index
+            self.redraw()
+        return "break"
+
+    # 滚动
+    def on_resize(self, event):
+        rows = max(1, event.height // self.line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self.redraw()
+
+    def on_mousewheel(self, event):
+        self.scroll_by(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def scroll_by(self, lines: int):
+        self.scroll_to(self.top + lines)
+        return "break"
+
+    def scroll_to(self, top: int):
+        top = max(0, min(top, self.count - self.rows))
+        if top != self.top:
+            self.top = top
+            self.redraw()
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self.count))
+        elif action == 'scroll':
+            step = self.rows if unit == 'pages' else 1
+            self.scroll_by(int(amount) * step)
+
+    # 渲染
+    def redraw(self):
+        first = self.top
+        last = min(self.count, first + self.rows)
+        rows = self.render(first, last) if last > first else []
+
+        self.listbox.delete(0, tk.END)
+        if rows:
+            self.listbox.insert(tk.END, *(text for text, _ in rows))
+        for offset, (_, color) in enumerate(rows):
+            if color:
+                self.listbox.itemconfig(offset, foreground=color)
+            if self.selectable and self.is_selected(first + offset):
+                self.listbox.selection_set(offset)
+
+        if self.count:
+            self.scrollbar.set(first / self.count, last / self.count)
+        else:
+            self.scrollbar.set(0, 1)
@@ -0,0 +1,196 @@
+import os
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .scheduler import RenameStep, safe_rename
+
+
+# 每完成多少个步骤才 fsync 一次完成标记
+SYNC_INTERVAL = 256
+
+
+def _encode_groups(groups: List[List[RenameStep]]) -> dict:
+    dirs = []
+    dir_index = {}
+
+    def index_of(directory: str) -> int:
+        if directory not in dir_index:
+            dir_index[directory] = len(dirs)
+            dirs.append(directory)
+        return dir_index[directory]
+
+    encoded = []
+    for group in groups:
+        encoded.append([
+            [
+                index_of(os.fspath(step.source.parent)), step.source.name,
+                index_of(os.fspath(step.target.parent)), step.target.name,
+                int(step.final)
+            ]
+            for step in group
+        ])
+    return {"d": dirs, "g": encoded}
+
+
+def _decode_groups(data: dict) -> List[List[RenameStep]]:
+    dirs = [Path(d) for d in data["d"]]
+    groups = []
+    for encoded in data["g"]:
+        group = []
+        for src_dir, src_name, dst_dir, dst_name, final in encoded:
+            source = dirs[src_dir] / src_name
+            origin = source
+            # 环的最后一步从临时名称出发，原始文件是第一步的源
+            if group and not group[0].final and source == group[0].target:
+                origin = group[0].source
+            group.append(RenameStep(source, dirs[dst_dir] / dst_name, origin, bool(final)))
+        groups.append(group)
+    return groups
+
+
+class PendingPlanError(RuntimeError):
+    """上次的重命名没有完成时拒绝开始新的重命名，否则会覆盖它的预写日志。"""
+
+    def __init__(self):
+        super().__init__("上次的重命名没有完成，请先继续执行 (resume) 或回滚 (rollback)")
+
+
+class PendingPlan:
+    """从预写日志中恢复的未完成计划。"""
+
+    def __init__(self, kind: str, timestamp: str, groups: List[List[RenameStep]],
+                 progress: dict, aborted: set, records: int = 1):
+        self.kind = kind
+        self.timestamp = timestamp
+        # 撤销计划合并了多少条历史记录
+        self.records = records
+        self.groups = groups
+        # 组下标 -> 日志中确认完成的步骤数
+        self.progress = progress
+        # 执行时失败而中止的组
+        self.aborted = aborted
+
+    def locate(self, gi: int) -> int:
+        """根据日志和文件系统状态确定第 gi 组已经完成了几步。"""
+        group = self.groups[gi]
+        if gi in self.aborted:
+            # 中止的环已经被回滚；中止的链保留已完成的步骤，标记是同步写入的
+            return 0 if not group[0].final else self.progress.get(gi, 0)
+
+        for i in range(self.progress.get(gi, 0), len(group)):
+            step = group[i]
+            if os.path.lexists(step.source) and not os.path.lexists(step.target):
+                return i
+            if not os.path.lexists(step.source) and not os.path.lexists(step.target):
+                # 文件已不在预期位置，交给后续执行报告错误
+                return i
+            # 源已不存在（已完成），或源被后一步重新占用（后一步也已完成）
+        return len(group)
+
+
+class RenameLog:
+    """重命名的预写日志。
+
+    执行前写入完整计划并 fsync；执行中追加完成标记，按批 fsync。
+    进入临时名称的步骤会立即 fsync，保证互换等环形重命名能被正确判断进度。
+    """
+
+    def __init__(self, path: Path, sync_interval: int = SYNC_INTERVAL):
+        self.path = Path(path)
+        self.sync_interval = sync_interval
+        self._file = None
+        self._groups = None
+        self._unsynced = 0
+        self._lock = threading.Lock()
+
+    def begin(self, groups: List[List[RenameStep]], kind: str = "execute", records: int = 1):
+        header = {"v": 1, "kind": kind, "t": datetime.now().isoformat()}
+        if records != 1:
+            header["n"] = records
+        header.update(_encode_groups(groups))
+        self._groups = groups
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write(json.dumps(header, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._sync()
+
+    def attach(self, plan: PendingPlan):
+        # 继续写入已有的日志（用于恢复执行）
+        self._groups = plan.groups
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def mark(self, gi: int, si: int):
+        if self._file is None:
+            return
+        with self._lock:
+            self._file.write(f"[{gi},{si}]\n")
+            self._unsynced += 1
+            if si < 0 or not self._groups[gi][si].final or self._unsynced >= self.sync_interval:
+                self._sync()
+
+    def commit(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def has_pending(self) -> bool:
+        # 与 load 的判断一致：能恢复出计划才算有未完成的重命名
+        return self.load() is not None
+
+    def load(self) -> Optional[PendingPlan]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header_line = f.readline()
+                if not header_line.endswith("\n"):
+                    # 计划本身没有写完整，说明还没有任何文件被改名
+                    return None
+                header = json.loads(header_line)
+                groups = _decode_groups(header)
+                progress = {}
+                aborted = set()
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    try:
+                        gi, si = json.loads(line)
+                        if not 0 <= gi < len(groups) or si >= len(groups[gi]):
+                            raise ValueError(line)
+                    except (ValueError, TypeError):
+                        # 损坏的完成标记，之后的内容都不可信
+                        break
+                    if si < 0:
+                        aborted.add(gi)
+                    else:
+                        progress[gi] = max(progress.get(gi, 0), si + 1)
+                return PendingPlan(header.get("kind", "execute"), header.get("t", ""),
+                                   groups, progress, aborted, header.get("n", 1))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+            return None
+
+
+def rollback_group(group: List[RenameStep], done: int) -> List[Tuple[RenameStep, Exception]]:
+    failures = []
+    for step in reversed(group[:done]):
+        try:
+            safe_rename(step.target, step.source)
+        except OSError as e:
+            failures.append((step, e))
+            break
+    return failures
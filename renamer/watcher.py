@@ -0,0 +1,320 @@
+import os
+import sys
+import stat
+import errno
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .scanner import iter_file_batches, DEFAULT_BATCH_SIZE
+from .filters import FileFilter, as_filter, is_path_pattern
+
+
+# 事件: (类型, 路径, 是否目录, 新路径)，类型为 create / delete / move / overflow
+Event = Tuple[str, str, bool, Optional[str]]
+
+
+class PollingBackend:
+    """轮询实现：记录每个目录的 mtime 和内容，只重新列举 mtime 变化的目录。
+
+    mtime 精度较粗的文件系统上，同一时间片内的多次修改可能要到下一次变化才能发现。
+    """
+
+    def __init__(self):
+        # 目录 -> (mtime_ns, {名称: 是否目录})
+        self._dirs: Dict[str, Tuple[int, Dict[str, bool]]] = {}
+
+    @staticmethod
+    def _list(path: str) -> Tuple[int, Dict[str, bool]]:
+        mtime = os.stat(path).st_mtime_ns
+        entries = {}
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    entries[entry.name] = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+        return mtime, entries
+
+    def add_dir(self, path: str):
+        try:
+            self._dirs[path] = self._list(path)
+        except OSError:
+            pass
+
+    def remove_dir(self, path: str):
+        self._dirs.pop(path, None)
+
+    def read(self) -> List[Event]:
+        events = []
+        for path, (mtime, entries) in list(self._dirs.items()):
+            try:
+                if os.stat(path).st_mtime_ns == mtime:
+                    continue
+                current = self._list(path)
+            except OSError:
+                # 目录本身被删除，由父目录的变化报告
+                continue
+
+            self._dirs[path] = current
+            new_entries = current[1]
+            for name, is_dir in entries.items():
+                if name not in new_entries or new_entries[name] != is_dir:
+                    events.append(("delete", os.path.join(path, name), is_dir, None))
+            for name, is_dir in new_entries.items():
+                if name not in entries or entries[name] != is_dir:
+                    events.append(("create", os.path.join(path, name), is_dir, None))
+        return events
+
+    def close(self):
+        self._dirs.clear()
+
+
+class InotifyBackend:
+    """Linux inotify 实现，通过 ctypes 调用 libc，不需要第三方库。"""
+
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+
+    MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+    _HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify 仅在 Linux 上可用")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        self._paths: Dict[int, str] = {}
+        self._wds: Dict[str, int] = {}
+
+    def add_dir(self, path: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                return
+            # ENOSPC: 超出 max_user_watches，交给调用方切换到轮询
+            raise OSError(err, os.strerror(err), path)
+        self._paths[wd] = path
+        self._wds[path] = wd
+
+    def remove_dir(self, path: str):
+        wd = self._wds.pop(path, None)
+        if wd is not None:
+            self._paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def read(self) -> List[Event]:
+        events = []
+        moves: Dict[int, Tuple[str, bool]] = {}
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = self._HEADER.unpack_from(data, offset)
+                offset += self._HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+
+                if mask & self.IN_Q_OVERFLOW:
+                    return [("overflow", "", False, None)]
+                if mask & self.IN_IGNORED:
+                    path = self._paths.pop(wd, None)
+                    if path is not None and self._wds.get(path) == wd:
+                        del self._wds[path]
+                    continue
+
+                parent = self._paths.get(wd)
+                if parent is None or not name:
+                    continue
+                path = os.path.join(parent, name)
+                is_dir = bool(mask & self.IN_ISDIR)
+
+                if mask & self.IN_MOVED_FROM:
+                    moves[cookie] = (path, is_dir)
+                elif mask & self.IN_MOVED_TO:
+                    source = moves.pop(cookie, None)
+                    if source is not None:
+                        events.append(("move", source[0], is_dir, path))
+                    else:
+                        events.append(("create", path, is_dir, None))
+                elif mask & self.IN_CREATE:
+                    events.append(("create", path, is_dir, None))
+                elif mask & self.IN_DELETE:
+                    events.append(("delete", path, is_dir, None))
+
+        # 没有配对的移出事件：文件被移到了监视范围之外
+        for path, is_dir in moves.values():
+            events.append(("delete", path, is_dir, None))
+        return events
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._paths.clear()
+        self._wds.clear()
+
+
+class FileWatcher:
+    """监视目录并维护内存中的文件集合。
+
+    首次 scan 之后，poll 只处理新增、删除和移动事件，
+    重新加载文件列表的代价与变化数量成正比，而不是与整棵目录树成正比。
+    优先使用 inotify，不可用时退回到按目录 mtime 轮询。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        pattern: Union[str, FileFilter] = "*",
+        recursive: bool = False,
+        use_inotify: bool = True,
+        on_change: Optional[Callable[[str], None]] = None
+    ):
+        if isinstance(pattern, str) and is_path_pattern(pattern):
+            raise ValueError(f"监视模式不支持包含路径的匹配模式: {pattern}")
+        self.directory = os.fspath(directory)
+        self.pattern = pattern
+        self.recursive = recursive
+        self.on_change = on_change
+        self._filter = as_filter(pattern)
+        # 保持插入顺序的文件集合
+        self._files: Dict[str, Path] = {}
+        self._dirs: Set[str] = set()
+
+        self.backend = None
+        if use_inotify:
+            try:
+                self.backend = InotifyBackend()
+            except (OSError, AttributeError):
+                self.backend = None
+        if self.backend is None:
+            self.backend = PollingBackend()
+
+    @property
+    def files(self) -> List[Path]:
+        return list(self._files.values())
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def scan(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Path]]:
+        """完整扫描一次并开始监视，按批次产出找到的文件。"""
+        self._files.clear()
+        yield from self._scan_tree(self.directory, batch_size)
+
+    def _scan_tree(self, root: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[Path]]:
+        # 借用 prune 回调记录遍历到的子目录
+        def record(entry):
+            self._watch(entry.path)
+            return False
+
+        self._watch(root)
+        for batch in iter_file_batches(root, self._filter, self.recursive, batch_size, prune=record):
+            for file_path in batch:
+                self._files[os.fspath(file_path)] = file_path
+            yield batch
+
+    def _watch(self, path: str):
+        if path in self._dirs:
+            return
+        try:
+            self.backend.add_dir(path)
+        except OSError:
+            # inotify 监视数量用尽，整体切换到轮询
+            self._fallback()
+            self.backend.add_dir(path)
+        self._dirs.add(path)
+
+    def _fallback(self):
+        self.backend.close()
+        self.backend = PollingBackend()
+        for path in self._dirs:
+            self.backend.add_dir(path)
+
+    def _unwatch_tree(self, root: str):
+        prefix = root + os.sep
+        for path in [p for p in self._dirs if p == root or p.startswith(prefix)]:
+            self._dirs.discard(path)
+            self.backend.remove_dir(path)
+
+    def _drop_tree(self, root: str):
+        prefix = root + os.sep
+        for key in [k for k in self._files if k.startswith(prefix)]:
+            self._remove(key)
+        self._unwatch_tree(root)
+
+    def _add(self, path: str):
+        # 大小和时间条件只在文件出现时判断
+        if not self._filter.match_name(os.path.basename(path)):
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        if stat.S_ISREG(st.st_mode) and (not self._filter.needs_stat or self._filter.match_stat(st)):
+            self._files[path] = Path(path)
+            self._changed(path)
+
+    def _remove(self, path: str):
+        if self._files.pop(path, None) is not None:
+            self._changed(path)
+
+    def _changed(self, path: str):
+        if self.on_change is not None:
+            self.on_change(path)
+
+    def _add_tree(self, root: str):
+        if self.recursive and not self._filter.prunes(os.path.basename(root)):
+            for batch in self._scan_tree(root):
+                for file_path in batch:
+                    self._changed(os.fspath(file_path))
+
+    def poll(self) -> int:
+        """处理积累的事件，返回变化的数量。"""
+        changes = 0
+        for kind, path, is_dir, new_path in self.backend.read():
+            changes += 1
+            if kind == "overflow":
+                # 事件丢失，只能整体重扫
+                for _ in self.scan():
+                    pass
+                if self.on_change is not None:
+                    self.on_change(self.directory)
+                continue
+
+            if kind in ("delete", "move"):
+                if is_dir:
+                    self._drop_tree(path)
+                else:
+                    self._remove(path)
+            if kind == "create" or kind == "move":
+                target = new_path or path
+                if is_dir:
+                    self._add_tree(target)
+                else:
+                    self._add(target)
+        return changes
+
+    def close(self):
+        self.backend.close()
+        self._dirs.clear()
@@ -0,0 +1,21 @@
+from pathlib import Path
+
+import pytest
+
+from renamer.core import FileRenamer
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    # 历史、预写日志和缓存都写到临时目录，不碰用户自己的文件
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setattr(Path, "home", classmethod(lambda cls: home))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(home / ".cache"))
+    monkeypatch.setenv("LOCALAPPDATA", str(home / "AppData" / "Local"))
+    return home
+
+
+@pytest.fixture
+def renamer(home):
+    return FileRenamer()
@@ -0,0 +1,59 @@
+from renamer.journal import HistoryJournal, encode_record
+
+
+def record(i):
+    return {"timestamp": f"2024-01-0{i}T00:00:00", "operations": [{"old": f"/d/{i}.txt", "new": f"/d/x{i}.txt"}]}
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    path = tmp_path / "history.jsonl"
+    journal = HistoryJournal(path)
+    journal.append(record(1))
+    # 追加第二条记录时进程退出
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(encode_record(record(2))[:20])
+
+    journal = HistoryJournal(path)
+    assert journal.records() == [record(1)]
+    assert path.read_text(encoding="utf-8") == encode_record(record(1)) + "\n"
+
+
+def test_append_after_torn_line_starts_a_new_line(tmp_path):
+    path = tmp_path / "history.jsonl"
+    HistoryJournal(path).append(record(1))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(encode_record(record(2))[:20])
+
+    # 新记录不能接在残行后面
+    HistoryJournal(path).append(record(3))
+    journal = HistoryJournal(path)
+    assert journal.records() == [record(1), record(3)]
+    assert journal.pop() == record(3)
+    assert HistoryJournal(path).records() == [record(1)]
+
+
+def test_undecodable_lines_are_skipped(tmp_path):
+    path = tmp_path / "history.jsonl"
+    path.write_text(
+        encode_record(record(1)) + "\n"
+        + encode_record(record(2))[:20] + encode_record(record(3)) + "\n",
+        encoding="utf-8"
+    )
+    journal = HistoryJournal(path)
+    assert journal.last() == record(1)
+    assert len(journal) == 1
+
+
+def test_malformed_record_is_skipped_when_decoded(tmp_path):
+    path = tmp_path / "history.jsonl"
+    # 合法的 JSON，但目录下标越界；加载时不展开，解码时才跳过
+    path.write_text(
+        encode_record(record(1)) + "\n" + '{"t":"x","d":[],"o":[[3,"a","b"]]}\n',
+        encoding="utf-8"
+    )
+    assert HistoryJournal(path).records() == [record(1)]
+    assert HistoryJournal(path).last() == record(1)
+    journal = HistoryJournal(path)
+    assert journal.pop() == record(1)
+    assert journal.pop() is None
+    assert HistoryJournal(path).records() == []
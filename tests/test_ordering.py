@@ -0,0 +1,14 @@
+from pathlib import Path
+
+from renamer.ordering import sort_paths
+
+
+def test_reverse_keeps_path_tiebreak_ascending():
+    files = [Path(p) for p in ("/b/1.txt", "/a/2.txt", "/a/1.txt", "/b/2.txt")]
+    # 同名文件按路径升序，只有名称的顺序被反转
+    assert sort_paths(files, "name", reverse=True) == [
+        Path("/a/2.txt"), Path("/b/2.txt"), Path("/a/1.txt"), Path("/b/1.txt")
+    ]
+    assert sort_paths(files, "name") == [
+        Path("/a/1.txt"), Path("/b/1.txt"), Path("/a/2.txt"), Path("/b/2.txt")
+    ]
@@ -0,0 +1,37 @@
+import random
+
+from renamer.rules import compile_rule
+
+
+def make_tree(root, dirs=("s1", "s2"), count=3):
+    for d in dirs:
+        (root / d).mkdir(parents=True)
+        for i in range(1, count + 1):
+            (root / d / f"{i:03}.txt").write_text(f"{d}/{i}")
+    return root
+
+
+def names(plan, root):
+    return [(str(old.relative_to(root)), new.name) for old, new in plan]
+
+
+def test_interleaved_directories_release_whole_directory(renamer, tmp_path):
+    root = make_tree(tmp_path / "t")
+    files = renamer.get_files(str(root), "*.txt", recursive=True)
+    # 按名称排序后两个目录的文件交错出现
+    plan = renamer.preview_number_rename(files, sort_by="name")
+    assert names(plan, root) == [
+        ("s1/001.txt", "001.txt"), ("s2/001.txt", "002.txt"),
+        ("s1/002.txt", "003.txt"), ("s2/002.txt", "004.txt"),
+        ("s1/003.txt", "005.txt"), ("s2/003.txt", "006.txt"),
+    ]
+
+
+def test_interleaved_preview_matches_incremental(renamer, tmp_path):
+    root = make_tree(tmp_path / "t", dirs=("a", "b", "c"), count=6)
+    files = renamer.get_files(str(root), "*.txt", recursive=True)
+    rng = random.Random(1)
+    for _ in range(20):
+        rng.shuffle(files)
+        rule = compile_rule("number", start=rng.randint(0, 8), digits=3)
+        assert renamer.preview_rename(files, rule) == renamer.preview_incremental(files, rule)
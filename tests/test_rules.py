@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pytest
+
+from renamer.rules import compile_rule, NameColumns
+
+
+def chain(*steps):
+    return compile_rule("chain", steps=list(steps))
+
+
+@pytest.mark.parametrize("name, steps, expected", [
+    # 前一步删光了名称：保留原名继续
+    ("q", [{"mode": "replace", "old_text": "q", "new_text": ""},
+           {"mode": "insert", "text": "x_"}], "x_q"),
+    # 前一步得到带路径分隔符的名称
+    ("a_b.txt", [{"mode": "replace", "old_text": "_", "new_text": "/"},
+                 {"mode": "insert", "text": "x_"}], "x_b.txt"),
+])
+def test_chain_intermediate_names(tmp_path, name, steps, expected):
+    f = tmp_path / name
+    rule = chain(*steps)
+    assert rule.apply_batch([f], NameColumns([name])) == [expected]
+    assert rule.apply(f) == expected
+
+
+def test_one_bad_name_does_not_abort_batch(tmp_path):
+    files = [tmp_path / "q", tmp_path / "ok.txt"]
+    rule = chain({"mode": "replace", "old_text": "q", "new_text": ""}, {"mode": "insert", "text": "x_"})
+    assert rule.apply_batch(files, NameColumns.from_paths(files)) == ["x_q", "x_ok.txt"]
+
+
+def test_name_key_folds_case_only_where_filesystem_does(monkeypatch):
+    from renamer import namespace
+    monkeypatch.setattr(namespace, "_FOLD_CASE", True)
+    assert namespace.name_key("Á.TXT") == namespace.name_key("á.txt")
+    monkeypatch.setattr(namespace, "_FOLD_CASE", False)
+    assert namespace.name_key("A.txt") != namespace.name_key("a.txt")
@@ -0,0 +1,36 @@
+import os
+
+from renamer.scancache import ScanCache
+from renamer.scanner import iter_file_batches
+
+
+def scan(root, cache, prune):
+    return sorted(
+        os.path.relpath(f, root)
+        for batch in iter_file_batches(root, "*", True, prune=prune, cache=cache)
+        for f in batch
+    )
+
+
+def test_prune_gets_direntry_interface_from_cache(tmp_path):
+    root = tmp_path / "root"
+    (root / "keep").mkdir(parents=True)
+    (root / "skip").mkdir()
+    (root / "keep" / "a.txt").write_text("a")
+    (root / "skip" / "b.txt").write_text("b")
+    os.symlink(root / "keep", root / "link", target_is_directory=True)
+    # 让目录 mtime 早于缓存的不信任窗口
+    for d in (root, root / "keep", root / "skip"):
+        os.utime(d, (0, 0))
+
+    cache = ScanCache(tmp_path / "scan.sqlite3")
+    seen = []
+
+    def prune(entry):
+        seen.append((entry.name, entry.is_dir(), entry.is_symlink(), entry.stat().st_ino > 0))
+        return entry.name == "skip"
+
+    cold = scan(root, cache, prune)
+    warm = scan(root, cache, prune)
+    assert cold == warm == [os.path.join("keep", "a.txt")]
+    assert seen[:len(seen) // 2] == seen[len(seen) // 2:]
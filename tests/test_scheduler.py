@@ -0,0 +1,43 @@
+def test_failed_chain_reports_skipped_steps(renamer, tmp_path):
+    for name in "abc":
+        (tmp_path / f"{name}.txt").write_text(name)
+    plan = [
+        (tmp_path / "a.txt", tmp_path / "b.txt"),
+        (tmp_path / "b.txt", tmp_path / "c.txt"),
+        (tmp_path / "c.txt", tmp_path / "nodir" / "d.txt"),
+    ]
+    success, errors = renamer.execute_rename(plan)
+    assert success == 0
+    assert len(errors) == 3
+    assert sorted(f.name for f in tmp_path.glob("*.txt")) == ["a.txt", "b.txt", "c.txt"]
+
+
+def test_failed_cycle_reports_rolled_back_steps(renamer, tmp_path):
+    for name in "ac":
+        (tmp_path / f"{name}.txt").write_text(name)
+    a, b, c = (tmp_path / f"{name}.txt" for name in "abc")
+    # 环中间的一步失败：b.txt 不存在，已完成的步骤被回滚
+    success, errors = renamer.execute_rename([(a, b), (b, c), (c, a)])
+    assert success == 0
+    assert len(errors) == 3
+    assert sorted(f.name for f in tmp_path.iterdir() if f.is_file()) == ["a.txt", "c.txt"]
+    assert (a.read_text(), c.read_text()) == ("a", "c")
+
+
+def test_existing_target_is_not_overwritten(renamer, tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("a")
+    b.write_text("b")
+    # b.txt 不在计划中，执行时也不能被替换
+    success, errors = renamer.execute_rename([(a, b)])
+    assert success == 0
+    assert len(errors) == 1
+    assert (a.read_text(), b.read_text()) == ("a", "b")
+
+
+def test_resolve_conflict_without_index(renamer, tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("a")
+    b.write_text("b")
+    assert renamer._resolve_conflict(b, a) == tmp_path / "b_1.txt"
+    assert renamer._resolve_conflict(a, a) == a
@@ -0,0 +1,88 @@
+import pytest
+
+from renamer.journal import compose_undo
+
+
+def record(*pairs):
+    return {"timestamp": "2024-01-01T00:00:00", "operations": [{"old": old, "new": new} for old, new in pairs]}
+
+
+@pytest.fixture
+def numbered(tmp_path):
+    directory = tmp_path / "files"
+    directory.mkdir()
+    for i in range(1, 4):
+        (directory / f"{i:03}.txt").write_text(f"{i:03}")
+    return directory
+
+
+def contents(directory):
+    return {f.name: f.read_text() for f in directory.iterdir()}
+
+
+def test_compose_chain_in_one_record():
+    # 001 -> 002 -> 003 -> 004 同时生效
+    composed = compose_undo([record(("/d/003", "/d/004"), ("/d/002", "/d/003"), ("/d/001", "/d/002"))])
+    assert sorted(composed) == [("/d/002", "/d/001"), ("/d/003", "/d/002"), ("/d/004", "/d/003")]
+
+
+def test_compose_swap_in_one_record():
+    composed = compose_undo([record(("/d/a", "/d/b"), ("/d/b", "/d/a"))])
+    assert sorted(composed) == [("/d/a", "/d/b"), ("/d/b", "/d/a")]
+
+
+def test_compose_several_records():
+    records = [
+        record(("/d/a", "/d/b"), ("/d/b", "/d/c")),
+        record(("/d/c", "/d/a"), ("/d/b", "/d/x")),
+        record(("/d/a", "/d/b"), ("/d/x", "/d/a")),
+    ]
+    # a 经 b、x 现在在 a；b 经 c、a 现在在 b
+    assert sorted(compose_undo(records)) == []
+    assert sorted(compose_undo(records[1:])) == [("/d/a", "/d/b"), ("/d/b", "/d/c")]
+
+
+def test_undo_renumber_chain(renamer, numbered):
+    files = sorted(renamer.get_files(str(numbered), "*.txt"))
+    success, errors = renamer.execute_rename(renamer.preview_number_rename(files, start=2))
+    assert (success, errors) == (3, [])
+    assert contents(numbered) == {"002.txt": "001", "003.txt": "002", "004.txt": "003"}
+
+    ok, _ = renamer.undo_last_operation()
+    assert ok
+    assert contents(numbered) == {"001.txt": "001", "002.txt": "002", "003.txt": "003"}
+    assert len(renamer.journal) == 0
+
+
+def test_undo_swap(renamer, numbered):
+    a, b = numbered / "001.txt", numbered / "002.txt"
+    assert renamer.execute_rename([(a, b), (b, a)]) == (2, [])
+    assert contents(numbered)["001.txt"] == "002"
+
+    ok, _ = renamer.undo_last_operation()
+    assert ok
+    assert contents(numbered) == {"001.txt": "001", "002.txt": "002", "003.txt": "003"}
+
+
+def test_undo_several_operations(renamer, numbered):
+    a, b, c = (numbered / f"{i:03}.txt" for i in range(1, 4))
+    renamer.execute_rename(renamer.preview_number_rename([a, b, c], start=2))
+    # 再把 002 和 003 互换
+    renamer.execute_rename([(b, c), (c, b)])
+    assert contents(numbered) == {"002.txt": "002", "003.txt": "001", "004.txt": "003"}
+
+    ok, _ = renamer.undo_last_operation(count=2)
+    assert ok
+    assert contents(numbered) == {"001.txt": "001", "002.txt": "002", "003.txt": "003"}
+    assert len(renamer.journal) == 0
+
+
+def test_undo_one_of_several(renamer, numbered):
+    a, b, c = (numbered / f"{i:03}.txt" for i in range(1, 4))
+    renamer.execute_rename(renamer.preview_number_rename([a, b, c], start=2))
+    renamer.execute_rename([(b, c), (c, b)])
+
+    assert renamer.undo_last_operation()[0]
+    assert contents(numbered) == {"002.txt": "001", "003.txt": "002", "004.txt": "003"}
+    assert renamer.undo_last_operation()[0]
+    assert contents(numbered) == {"001.txt": "001", "002.txt": "002", "003.txt": "003"}
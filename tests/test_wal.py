@@ -0,0 +1,62 @@
+import pytest
+
+from renamer.cli import main
+from renamer.scheduler import schedule_renames
+from renamer.wal import PendingPlanError
+
+
+def interrupted(renamer, directory):
+    # 写入计划后只完成第一步，模拟进程在执行中途退出
+    a, b = directory / "a.txt", directory / "b.txt"
+    a.write_text("a")
+    b.write_text("b")
+    groups, _ = schedule_renames([(a, directory / "x_a.txt"), (b, directory / "x_b.txt")])
+    renamer.wal.begin(groups)
+    a.rename(directory / "x_a.txt")
+    renamer.wal.mark(0, 0)
+    renamer.wal.close()
+
+
+def test_new_rename_keeps_pending_plan(renamer, tmp_path):
+    directory = tmp_path / "files"
+    directory.mkdir()
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "z.txt").write_text("z")
+
+    interrupted(renamer, directory)
+    assert renamer.has_pending()
+
+    with pytest.raises(PendingPlanError):
+        renamer.execute_rename([(other / "z.txt", other / "p_z.txt")])
+    assert not renamer.undo_last_operation()[0]
+    assert main(["execute", str(other), "prefix", "p_"]) == 2
+    assert (other / "z.txt").exists()
+
+    # 原来的计划仍然可以继续执行
+    count, errors = renamer.resume()
+    assert errors == []
+    assert sorted(f.name for f in directory.iterdir()) == ["x_a.txt", "x_b.txt"]
+    assert not renamer.has_pending()
+    assert renamer.execute_rename([(other / "z.txt", other / "p_z.txt")]) == (1, [])
+
+
+def test_corrupt_progress_line_stops_reading(renamer, tmp_path):
+    directory = tmp_path / "files"
+    directory.mkdir()
+    interrupted(renamer, directory)
+    with open(renamer.wal.path, "a", encoding="utf-8") as f:
+        f.write("\0" * 16 + "\n[0,1]\n")
+
+    # 损坏的行之后的标记不再采用，计划仍能回滚并清除日志
+    assert renamer.has_pending()
+    assert renamer.rollback() == (1, [])
+    assert sorted(f.name for f in directory.iterdir()) == ["a.txt", "b.txt"]
+    assert not renamer.has_pending()
+
+
+def test_incomplete_header_is_not_pending(renamer):
+    renamer.wal.path.write_text('{"v":1}\n', encoding="utf-8")
+    assert not renamer.has_pending()
+    assert renamer.resume() == (0, [])
+    assert renamer.execute_rename([]) == (0, [])